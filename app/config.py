@@ -3,8 +3,9 @@ Application configuration using Pydantic Settings.
 
 Centralizes configuration with environment variable support and type validation.
 """
+from functools import cached_property
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -22,27 +23,59 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "fxohlc"
     
-    # Redis Configuration - Pub/Sub for event-driven tick distribution
+    # Redis Configuration - Streams for event-driven tick distribution
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_URL: str = "redis://redis:6379"
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 64  # Shared pool for publisher, consumer and WebSocket listener
     
     # Application Configuration
-    TICK_CHANNEL: str = "eurusd_ticks"  # Redis channel for tick streaming
+    TICK_STREAM: str = "eurusd_stream"  # Redis stream ticks are appended to
+    TICK_STREAM_MAXLEN: int = 100000  # Approximate cap on retained stream entries
+    TICK_CONSUMER_GROUP: str = "ohlc_group"  # Consumer group persisting ticks to the database
+    CONSUMER_BATCH_SIZE: int = 500  # Max stream entries written per database transaction
+    CONSUMER_WORKERS: int = 4  # Concurrent insert workers (each holds one DB connection while writing)
+    CONSUMER_CLAIM_IDLE_MS: int = 60000  # Unacked entries idle this long are reclaimed and retried
+    ALLOWED_SYMBOLS: List[str] = ["EURUSD"]  # Symbols given their own metric series; others map to "other"
     LOG_LEVEL: str = "INFO"  # Logging verbosity (DEBUG/INFO/WARNING/ERROR)
     
+    # Tick Publisher Settings - Batches PUBLISH commands into pipelined round-trips
+    TICK_INTERVAL: float = 1.0  # Seconds between generated ticks
+    TICK_BATCH_SIZE: int = 100  # Max ticks sent per Redis pipeline flush
+    TICK_FLUSH_INTERVAL_MS: int = 50  # Max time a buffered tick waits before flushing
+    TICK_MAX_INFLIGHT: int = 256  # Max pipelined flushes awaiting a Redis reply
+    TICK_QUEUE_SIZE: int = 1024  # Ticks buffered between generator and flusher before dropping
+    
     # API Configuration - Displayed in Swagger UI
     API_TITLE: str = "FX OHLC Microservice"
     API_VERSION: str = "1.0.0"
     API_DESCRIPTION: str = "Production-ready microservice for real-time FX OHLC data"
+    HTTP_METRICS_ENABLED: bool = True  # Per-request latency histograms for REST routes
+    CORS_ORIGINS: List[str] = []  # Cross-origin callers (JSON list); the /demo page is same-origin
     
     # Performance Settings - Database connection pooling to prevent connection overhead
-    DB_POOL_SIZE: int = 20  # Max connections in pool
-    DB_MAX_OVERFLOW: int = 40  # Additional connections beyond pool_size
+    DB_POOL_SIZE: int = 20  # Max connections in pool (capped by the per-worker share of DB_MAX_CONNECTIONS)
+    DB_MAX_OVERFLOW: int = 40  # Additional connections beyond pool_size (same cap)
+    DB_MAX_CONNECTIONS: int = 97  # Server budget shared by all workers: max_connections - superuser_reserved_connections
     DB_POOL_RECYCLE: int = 3600  # Recycle connections after 1 hour to prevent stale connections
+    DB_POOL_TIMEOUT: float = 5.0  # Seconds to wait for a free connection before erroring
+    DB_POOL_PRE_PING: bool = False  # SELECT 1 before each checkout; enable only where idle connections get dropped
+    DB_TCP_KEEPALIVE_IDLE: int = 60  # Seconds of idle before TCP keepalive probes start
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # Prepared statements cached per connection (asyncpg + SQLAlchemy)
+    WEB_CONCURRENCY: int = 1  # Uvicorn worker processes (uvicorn reads it too), each owning its own pool; with 1, API ticks reach WebSockets without Redis
+    RUN_DDL_ON_STARTUP: bool = True  # Disable when the schema is managed by scripts/init_db.py
+    
+    # OHLC Response Cache - TTLs follow the continuous aggregate refresh policies (0 disables)
+    OHLC_CACHE_TTL_MINUTE: float = 5.0
+    OHLC_CACHE_TTL_HOUR: float = 30.0
+    OHLC_CACHE_TTL_DAY: float = 300.0
+    OHLC_CACHE_MAX_ENTRIES: int = 1024  # Per worker process
+    OHLC_STREAM_MIN_INTERVAL: float = 1.0  # Min seconds between WebSocket OHLC pushes (coalesces NOTIFY bursts)
+    WS_TICK_BATCH_MS: int = 10  # Coalesce /ws/ticks frames into JSON arrays for up to this long (0 sends one tick per frame)
+    WS_TICK_BATCH_MAX: int = 100  # Flush a /ws/ticks batch early once it holds this many ticks
     
-    @property
+    @cached_property
     def database_url(self) -> str:
         """Async database URL using asyncpg driver for non-blocking I/O."""
         return (
@@ -50,15 +83,15 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
     
-    @property
+    @cached_property
     def database_url_sync(self) -> str:
         """Sync database URL for initial setup operations (CREATE EXTENSION, etc.)."""
         return (
             f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
-            f"@{self. POSTGRES_HOST}:{self. POSTGRES_PORT}/{self. POSTGRES_DB}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
     
-    @property
+    @cached_property
     def redis_url_with_auth(self) -> str:
         """Redis URL with optional authentication for production environments."""
         if self.REDIS_PASSWORD:
@@ -68,6 +101,7 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         case_sensitive = True
+        frozen = True  # Immutable after load, so the cached URLs can never go stale
 
 
 settings = Settings()
\ No newline at end of file
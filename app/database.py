@@ -4,32 +4,60 @@ Database connection and session management.
 Configures async SQLAlchemy engine with connection pooling for TimescaleDB.
 """
 import logging
+import socket
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker,
 )
+from sqlalchemy import event, text
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Each worker gets an equal share of the server's connection budget, less the
+# OHLC streamer's dedicated connection; DB_POOL_SIZE/DB_MAX_OVERFLOW are upper
+# bounds within that share
+WORKER_CONNECTIONS = settings.DB_MAX_CONNECTIONS // settings.WEB_CONCURRENCY
+POOL_SIZE = max(1, min(settings.DB_POOL_SIZE, WORKER_CONNECTIONS - 1))
+MAX_OVERFLOW = max(0, min(settings.DB_MAX_OVERFLOW, WORKER_CONNECTIONS - 1 - POOL_SIZE))
+
 # Async engine with connection pooling for high concurrency
-# pool_pre_ping: Validates connections before use to prevent stale connection errors
+# pool_pre_ping: Optional SELECT 1 on checkout; TCP keepalives (below) catch dead peers instead
+# pool_use_lifo: Reuses the most recently returned connection so idle ones can expire
 # jit=off: Disables JIT compilation in PostgreSQL for faster query execution
+# statement caches: asyncpg keeps prepared plans per connection across requests
 engine = create_async_engine(
     settings.database_url,
     echo=False,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_use_lifo=True,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     pool_recycle=settings.DB_POOL_RECYCLE,
     connect_args={
-        "server_settings": {"jit": "off"}
+        "server_settings": {"jit": "off"},
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
     }
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _enable_tcp_keepalive(dbapi_connection, connection_record):
+    """Enable TCP keepalives so dropped connections are detected without pre-ping."""
+    transport = getattr(dbapi_connection.driver_connection, "_transport", None)
+    sock = transport.get_extra_info("socket") if transport else None
+    if sock is None or sock.family == socket.AF_UNIX:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, settings.DB_TCP_KEEPALIVE_IDLE)
+
+
 # Session factory for creating database sessions
 # expire_on_commit=False: Keeps objects accessible after commit
 AsyncSessionLocal = async_sessionmaker(
@@ -62,16 +90,57 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db():
-    """Initialize database tables."""
+    """
+    Initialize database tables.
+    
+    Probes for all model tables with a single to_regclass() query and only
+    runs create_all (which reflects each table separately) if any are missing.
+    """
     # Import models to register them with Base.metadata
     from app import models  # noqa: F401
     
     async with engine.begin() as conn:
+        result = await conn.execute(
+            text("SELECT count(*) FROM unnest(CAST(:names AS text[])) AS name WHERE to_regclass(name) IS NULL"),
+            {"names": list(Base.metadata.tables)}
+        )
+        if result.scalar() == 0:
+            logger.info("Database tables already exist, skipping creation")
+            return
+        
         logger.info("Creating database tables...")
         await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
 
 
+async def check_pool_capacity():
+    """
+    Verify that every worker's connections fit within PostgreSQL max_connections.
+    
+    Counts the full pool plus the OHLC streamer's connection per worker. Fails
+    fast at startup instead of surfacing TooManyConnectionsError once all
+    workers grow their pools under load (DB_MAX_CONNECTIONS set too high).
+    """
+    per_worker = POOL_SIZE + MAX_OVERFLOW + 1
+    total = settings.WEB_CONCURRENCY * per_worker
+    
+    async with engine.connect() as conn:
+        max_connections = int((await conn.execute(text("SHOW max_connections"))).scalar())
+        reserved = int((await conn.execute(text("SHOW superuser_reserved_connections"))).scalar())
+    available = max_connections - reserved
+    
+    logger.info(
+        f"Database pool: {settings.WEB_CONCURRENCY} worker(s) x {per_worker} connections "
+        f"(pool {POOL_SIZE} + overflow {MAX_OVERFLOW} + streamer) = {total} of {available} available"
+    )
+    if total > available:
+        raise RuntimeError(
+            f"Database pool too large: {total} connections across workers exceeds "
+            f"{available} available (max_connections={max_connections}, reserved={reserved}); "
+            f"lower DB_MAX_CONNECTIONS"
+        )
+
+
 async def close_db():
     """Close database connections."""
     await engine.dispose()
@@ -1,103 +1,249 @@
 """
-Tick data generation and publishing to Redis Pub/Sub.
+Tick data generation and publishing to a Redis stream.
 
 Simulates FX market data for testing and demonstration purposes.
 In production, replace with real market data feed integration.
 """
 import asyncio
-import json
 import logging
-import random
 import time
+import numpy as np
+import orjson
 from datetime import datetime, timezone
 from redis import asyncio as aioredis
 from app.config import settings
 from app.metrics import (
     ticks_ingested_total,
+    ticks_dropped_total,
     redis_messages_published,
     background_task_duration,
-    background_task_errors
+    background_task_errors,
+    safe_labels
 )
 
 logger = logging.getLogger(__name__)
 
+# Number of random price changes generated per NumPy refill
+_RNG_BLOCK_SIZE = 8192
+
 
 class TickGenerator:
     """Generates simulated EURUSD tick data."""
     
-    def __init__(self, initial_price: float = 1.10000):
+    def __init__(self, initial_price: float = 1.10000, symbol: str = "EURUSD"):
         self.price = initial_price
+        self.symbol = symbol
         self.redis_client = None
         self. running = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.TICK_QUEUE_SIZE)  # Producer -> flusher
+        self._inflight = asyncio.Semaphore(settings.TICK_MAX_INFLIGHT)  # Bounds unacknowledged flushes
+        self._tasks: set[asyncio.Task] = set()  # Flushes still waiting on Redis
+        self._cached_sec = -1  # Epoch second of the cached ISO prefix
+        self._cached_prefix = ""  # "YYYY-MM-DDTHH:MM:SS" for _cached_sec
+        
+        # Price changes are drawn in vectorized blocks and consumed one per tick
+        self._rng = np.random.default_rng()
+        self._rng_buf = self._rng.uniform(-0.0005, 0.0005, _RNG_BLOCK_SIZE)
+        self._rng_idx = 0
+        
+        # Static parts of the tick payload, encoded once instead of per tick
+        self._stream_bytes = settings.TICK_STREAM.encode()
+        self._json_prefix = b'{"time":"'
+        self._json_mid = b'","symbol":' + orjson.dumps(symbol) + b',"price":'
+        self._json_suffix = b'}'
+        
+        # Labeled metric children, resolved once since symbol and stream are fixed
+        self._m_ticks = safe_labels(ticks_ingested_total, symbol=symbol)
+        self._m_dropped = safe_labels(ticks_dropped_total, symbol=symbol)
+        self._m_pub = redis_messages_published.labels(channel=settings.TICK_STREAM)
+        self._m_dur = background_task_duration.labels(task_name='tick_publisher')
+        self._m_err = background_task_errors.labels(task_name='tick_publisher')
+        self._m_drift = background_task_errors.labels(task_name='tick_generator_drift')
     
-    async def connect(self):
-        """Connect to Redis."""
-        try:
-            self.redis_client = await aioredis.from_url(
-                settings.redis_url_with_auth,
-                decode_responses=True,
-                encoding="utf-8"
-            )
-            logger.info("Connected to Redis for tick publishing")
-        except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            raise
+    async def connect(self, pool: aioredis.ConnectionPool):
+        """Attach to the shared Redis connection pool."""
+        self.redis_client = aioredis.Redis(connection_pool=pool)
+        logger.info("Connected to Redis for tick publishing")
     
     async def generate_ticks(self):
-        """Generate and publish ticks every second."""
+        """
+        Generate ticks and publish them to Redis in pipelined batches.
+        
+        Runs a producer and a flusher concurrently, decoupled by a bounded
+        queue so a slow Redis round-trip never delays tick creation.
+        """
         self.running = True
         logger.info("Starting tick generator...")
         
         try:
-            while self.running:
-                tick = self._create_tick()
-                await self._publish_tick(tick)
-                await asyncio.sleep(1)  # 1-second interval
+            await asyncio.gather(self._producer(), self._batched_flusher())
         except Exception as e:
-            logger.error(f"Tick generator error: {e}")
+            logger.error("Tick generator error: %s", e)
         finally:
             await self. disconnect()
     
-    def _create_tick(self) -> dict:
-        """Create a single tick with random price movement."""
+    async def _producer(self):
+        """
+        Create one tick per TICK_INTERVAL and queue it for publishing.
+        
+        Sleeps until a fixed deadline rather than for a fixed period, so time
+        spent creating ticks does not stretch the tick interval.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        
+        try:
+            while self.running:
+                self._publish_tick(self._create_tick())
+                
+                deadline += settings.TICK_INTERVAL
+                now = loop.time()
+                if now < deadline:
+                    await asyncio.sleep(deadline - now)
+                else:
+                    # Fell behind schedule: record it and resync instead of bursting
+                    self._m_drift.inc()
+                    deadline = now
+                    await asyncio.sleep(0)
+        finally:
+            # Tell the flusher to publish what's left and stop
+            await self._queue.put(None)
+    
+    async def _batched_flusher(self):
+        """
+        Drain the queue into batches and hand each one to a pipelined flush.
+        
+        A batch is sent once TICK_BATCH_SIZE ticks are collected or
+        TICK_FLUSH_INTERVAL_MS has passed since its first tick, so many XADD
+        commands share a single network round-trip.
+        """
+        loop = asyncio.get_running_loop()
+        flush_interval = settings.TICK_FLUSH_INTERVAL_MS / 1000
+        
+        while True:
+            payload = await self._queue.get()
+            if payload is None:
+                return
+            
+            batch = [payload]
+            linger_until = loop.time() + flush_interval
+            stopping = False
+            while len(batch) < settings.TICK_BATCH_SIZE:
+                try:
+                    if self._queue.empty():
+                        payload = await asyncio.wait_for(self._queue.get(), linger_until - loop.time())
+                    else:
+                        payload = self._queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if payload is None:
+                    stopping = True
+                    break
+                batch.append(payload)
+            
+            await self._flush(batch)
+            if stopping:
+                return
+    
+    def _create_tick(self) -> bytes:
+        """
+        Create a single tick with random price movement.
+        
+        Returns the JSON payload directly, splicing the varying time and price
+        between precomputed byte fragments rather than encoding a dict.
+        """
         # Simulate realistic FX price movement
-        change = random.uniform(-0.0005, 0.0005)
+        if self._rng_idx == _RNG_BLOCK_SIZE:
+            self._rng_buf = self._rng.uniform(-0.0005, 0.0005, _RNG_BLOCK_SIZE)
+            self._rng_idx = 0
+        change = float(self._rng_buf[self._rng_idx])
+        self._rng_idx += 1
         self.price += change
         
         # Keep price in realistic range
         self.price = max(0.5, min(2.0, self.price))
         
-        tick = {
-            "time": datetime. now(timezone.utc).isoformat(),
-            "symbol": "EURUSD",
-            "price": round(self.price, 5)
-        }
-        return tick
+        return (
+            self._json_prefix
+            + self._timestamp().encode()
+            + self._json_mid
+            + f"{self.price:.5f}".encode()
+            + self._json_suffix
+        )
+    
+    def _timestamp(self) -> str:
+        """
+        Current UTC time as an ISO 8601 string with microsecond precision.
+        
+        The date/time prefix is formatted once per second and reused, so each
+        tick only pays for splicing in the sub-second part.
+        """
+        sec, nanos = divmod(time.time_ns(), 1_000_000_000)
+        if sec != self._cached_sec:
+            self._cached_prefix = datetime.fromtimestamp(sec, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+            self._cached_sec = sec
+        return f"{self._cached_prefix}.{nanos // 1000:06d}+00:00"
+    
+    def _publish_tick(self, payload: bytes):
+        """Queue a serialized tick for the flusher, dropping it if the queue is full."""
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self._m_dropped.inc()
     
-    async def _publish_tick(self, tick: dict):
-        """Publish tick to Redis channel."""
-        start_time = time.time()
+    async def _flush(self, batch: list[bytes]):
+        """
+        Hand a batch of ticks to a background pipeline without awaiting the reply.
+        
+        XADD replies (entry IDs) are unused, so the flusher only
+        waits when TICK_MAX_INFLIGHT flushes are already outstanding.
+        """
+        await self._inflight.acquire()
+        task = asyncio.create_task(self._send_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_batch_done)
+    
+    def _on_batch_done(self, task: asyncio.Task):
+        """Release the in-flight slot held by a completed flush."""
+        self._tasks.discard(task)
+        self._inflight.release()
+    
+    async def _send_batch(self, batch: list[bytes]):
+        """
+        Append a batch of ticks to the Redis stream in one round-trip.
+        
+        Each entry carries the JSON tick under a single "data" field, and the
+        stream is trimmed approximately to TICK_STREAM_MAXLEN entries.
+        """
+        start_ns = time.perf_counter_ns()
         try:
-            await self.redis_client.publish(
-                settings. TICK_CHANNEL,
-                json.dumps(tick)
-            )
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for payload in batch:
+                    pipe.xadd(
+                        self._stream_bytes,
+                        {b"data": payload},
+                        maxlen=settings.TICK_STREAM_MAXLEN,
+                        approximate=True
+                    )
+                await pipe.execute()
             
-            # Update metrics
-            ticks_ingested_total.labels(symbol=tick['symbol']).inc()
-            redis_messages_published.labels(channel=settings.TICK_CHANNEL).inc()
+            # Update metrics once per flush rather than once per tick
+            self._m_ticks.inc(len(batch))
+            self._m_pub.inc(len(batch))
             
-            logger.debug(f"Published tick: {tick}")
+            logger.debug("Published %d ticks", len(batch))
         except Exception as e:
-            logger. error(f"Error publishing tick: {e}")
-            background_task_errors.labels(task_name='tick_publisher').inc()
+            logger.error("Error publishing ticks: %s", e)
+            self._m_err.inc()
         finally:
-            duration = time.time() - start_time
-            background_task_duration.labels(task_name='tick_publisher').observe(duration)
+            # One observation per batch, timed on the monotonic clock
+            self._m_dur.observe((time.perf_counter_ns() - start_ns) * 1e-9)
     
     async def disconnect(self):
-        """Disconnect from Redis."""
+        """Drain in-flight publishes and disconnect from Redis."""
         self.running = False
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
         if self.redis_client:
             await self.redis_client.close()
         logger.info("Disconnected tick generator from Redis")
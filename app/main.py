@@ -2,7 +2,7 @@
 FastAPI application for FX OHLC tick data ingestion and aggregation.
 
 Main application providing:
-- Real-time tick data ingestion via Redis Pub/Sub
+- Real-time tick data ingestion via Redis Streams
 - CRUD operations for tick management
 - Automatic OHLC aggregation using TimescaleDB continuous aggregates
 - WebSocket streaming for live data feeds
@@ -10,28 +10,30 @@ Main application providing:
 - Prometheus metrics for observability
 """
 import asyncio
+import gzip
 import logging
+import orjson
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from redis import asyncio as aioredis
 from datetime import datetime, timezone
-from prometheus_client import make_asgi_app
 from prometheus_fastapi_instrumentator import Instrumentator
 from app.config import settings
-from app.database import init_db, close_db
+from app.database import init_db, close_db, check_pool_capacity
 from app.timescale_setup import setup_timescaledb, setup_custom_day_aggregate
 from app.ohlc import router as ohlc_router
 from app.tick_api import router as tick_router
 from app.websocket import router as websocket_router, manager
 from app.ws_test import router as ws_test_router
 from app.ingestion import tick_generator
-from app.redis_pubsub import tick_consumer
+from app.redis_pubsub import tick_consumer, close_publisher
 from app.schemas import HealthResponse
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
+    level=settings.LOG_LEVEL.upper(),  # Resolved by logging itself; unknown names raise ValueError
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -42,18 +44,27 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting FX OHLC Microservice...")
     
-    # Initialize database
-    await init_db()
+    # Initialize database schema (skip when managed by scripts/init_db.py)
+    if settings.RUN_DDL_ON_STARTUP:
+        await init_db()
+        await setup_timescaledb()
+        await setup_custom_day_aggregate()
+    await check_pool_capacity()
     
-    # Set up TimescaleDB
-    await setup_timescaledb()
-    await setup_custom_day_aggregate()
+    # One Redis connection pool shared by every background subsystem.
+    # Replies stay raw bytes: orjson parses stream payloads without a str pass
+    redis_pool = aioredis.ConnectionPool.from_url(
+        settings.redis_url_with_auth,
+        max_connections=settings.REDIS_MAX_CONNECTIONS
+    )
+    app.state.redis_pool = redis_pool
     
     # Start background tasks
-    consumer_task = asyncio.create_task(start_consumer())
-    generator_task = asyncio.create_task(start_generator())
-    ws_redis_task = asyncio.create_task(start_websocket_redis())
+    consumer_task = asyncio.create_task(start_consumer(redis_pool))
+    generator_task = asyncio.create_task(start_generator(redis_pool))
+    ws_redis_task = asyncio.create_task(start_websocket_redis(redis_pool))
     ws_ohlc_task = asyncio.create_task(start_websocket_ohlc())
+    ws_flush_task = asyncio.create_task(start_websocket_flusher())
     
     logger.info("Application started successfully")
     
@@ -67,33 +78,36 @@ async def lifespan(app: FastAPI):
     generator_task.cancel()
     ws_redis_task.cancel()
     ws_ohlc_task.cancel()
+    ws_flush_task.cancel()
     await manager.shutdown()
+    await redis_pool.disconnect()
+    await close_publisher()
     await close_db()
     logger.info("Shutdown complete")
 
 
-async def start_consumer():
+async def start_consumer(redis_pool: aioredis.ConnectionPool):
     """Start Redis tick consumer."""
     try:
-        await tick_consumer.connect()
+        await tick_consumer.connect(redis_pool)
         await tick_consumer.consume_ticks()
     except Exception as e:
         logger.error(f"Consumer failed: {e}")
 
 
-async def start_generator():
+async def start_generator(redis_pool: aioredis.ConnectionPool):
     """Start tick generator."""
     try:
-        await tick_generator.connect()
+        await tick_generator.connect(redis_pool)
         await tick_generator.generate_ticks()
     except Exception as e:
         logger.error(f"Generator failed: {e}")
 
 
-async def start_websocket_redis():
+async def start_websocket_redis(redis_pool: aioredis.ConnectionPool):
     """Start WebSocket Redis listener."""
     try:
-        await manager.start_redis_listener()
+        await manager.start_redis_listener(redis_pool)
     except Exception as e:
         logger.error(f"WebSocket Redis listener failed: {e}")
 
@@ -106,35 +120,51 @@ async def start_websocket_ohlc():
         logger.error(f"WebSocket OHLC streamer failed: {e}")
 
 
+async def start_websocket_flusher():
+    """Start WebSocket tick batch flusher."""
+    try:
+        await manager.start_tick_flusher()
+    except Exception as e:
+        logger.error(f"WebSocket tick flusher failed: {e}")
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.API_TITLE,
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS middleware - only installed when cross-origin callers are configured
+if settings.CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials="*" not in settings.CORS_ORIGINS,
+        allow_methods=["GET", "POST", "PUT", "DELETE"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
 
-# Prometheus instrumentation
-Instrumentator().instrument(app).expose(app)
+# Prometheus instrumentation - REST routes only; WebSocket, demo and scrape
+# endpoints are excluded so they don't pay for a histogram observation
+instrumentator = Instrumentator(
+    excluded_handlers=["/ws.*", "/demo", "/metrics"],
+    should_group_status_codes=True,
+    should_ignore_untemplated=True,
+)
+if settings.HTTP_METRICS_ENABLED:
+    instrumentator.instrument(app)
 
-# Mount Prometheus metrics endpoint
-metrics_app = make_asgi_app()
-app.mount("/metrics", metrics_app)
+# Expose all metrics (including app.metrics) on /metrics
+instrumentator.expose(app, include_in_schema=False, endpoint="/metrics")
 
 # Include routers - CQRS Implementation
 # =====================================
 # WRITE SIDE (Command):
 #   - tick_router: POST/PUT/DELETE for manual tick management
-#   - Background tasks: Redis Pub/Sub ingestion (high throughput)
+#   - Background tasks: Redis Streams ingestion (high throughput)
 # READ SIDE (Query):
 #   - ohlc_router: GET-only OHLC queries (real-time aggregates)
 #   - websocket_router: Real-time streaming
@@ -144,34 +174,41 @@ app.include_router(websocket_router)  # READ: Real-time streaming
 app.include_router(ws_test_router)  # Utility: WebSocket test page
 
 
+# Static part of the health payload; only the timestamp changes per probe
+_HEALTH_STATIC = {
+    "status": "healthy",
+    "database": "connected",
+    "redis": "connected",
+    "version": settings.API_VERSION,
+}
+
+
+class _HealthJSONResponse(ORJSONResponse):
+    """ORJSONResponse writing UTC datetimes with a "Z" suffix, as Pydantic did."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def _health_response() -> ORJSONResponse:
+    """Build the health payload without constructing a HealthResponse model."""
+    return _HealthJSONResponse({**_HEALTH_STATIC, "timestamp": datetime.now(timezone.utc)})
+
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint - health check."""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(timezone.utc),
-        database="connected",
-        redis="connected",
-        version=settings.API_VERSION
-    )
+    return _health_response()
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Detailed health check."""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(timezone.utc),
-        database="connected",
-        redis="connected",
-        version=settings.API_VERSION
-    )
+    return _health_response()
 
 
-@app.get("/demo", response_class=HTMLResponse)
-async def websocket_demo():
-    """WebSocket demo page."""
-    return """
+# Demo page markup, encoded (and gzip-compressed) once at import so requests only copy bytes
+_DEMO_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -313,7 +350,9 @@ async def websocket_demo():
                     document.getElementById('tick-status').textContent = 'Connected ✓';
                 };
                 tickWs.onmessage = (event) => {
-                    const data = JSON.parse(event. data);
+                    // Ticks arrive batched as arrays; show the newest one
+                    const batch = JSON.parse(event. data);
+                    const data = Array.isArray(batch) ? batch[batch.length - 1] : batch;
                     document.getElementById('tick-data').innerHTML = 
                         `<div class="price">${data.price}</div>` +
                         `<div class="label">Symbol: ${data.symbol}</div>` +
@@ -403,4 +442,17 @@ async def websocket_demo():
         </script>
     </body>
     </html>
-    """
\ No newline at end of file
+    """
+_DEMO_HTML_BYTES = _DEMO_HTML.encode("utf-8")
+_DEMO_HTML_GZIP = gzip.compress(_DEMO_HTML_BYTES, compresslevel=9)
+
+
+@app.get("/demo", response_class=HTMLResponse)
+async def websocket_demo(request: Request):
+    """WebSocket demo page (served gzip-compressed when the client accepts it)."""
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return HTMLResponse(
+            content=_DEMO_HTML_GZIP,
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return HTMLResponse(content=_DEMO_HTML_BYTES, headers={"Vary": "Accept-Encoding"})
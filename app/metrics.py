@@ -7,9 +7,35 @@ Provides custom metrics for monitoring:
 - WebSocket connections
 - Database operations
 - Redis pub/sub messages
+
+Histograms use five buckets sized to each metric's expected range, since
+every bucket is a separate series per label set.
+
+Symbol and rejection-reason labels are restricted to known values via
+safe_labels() so bad input cannot create unbounded time series.
 """
+from enum import Enum
+
 from prometheus_client import Counter, Histogram, Gauge, Info
 
+from app.config import settings
+
+
+
+class RejectReason(str, Enum):
+    """Closed set of reasons a tick can be rejected for."""
+    NON_POSITIVE = "non_positive"
+    OUT_OF_RANGE = "out_of_range"
+    BAD_TIME = "bad_time"
+    BAD_JSON = "bad_json"
+    BAD_SYMBOL = "bad_symbol"
+
+
+# Label allow-lists - anything outside these collapses into a single "other" series
+ALLOWED_SYMBOLS = frozenset(settings.ALLOWED_SYMBOLS)
+ALLOWED_REJECT_REASONS = frozenset(reason.value for reason in RejectReason)
+OTHER_LABEL = "other"
+
 # Application info
 app_info = Info('fx_ohlc_app', 'FX OHLC Microservice Information')
 app_info.info({
@@ -24,9 +50,16 @@ ticks_ingested_total = Counter(
     ['symbol']
 )
 
+# Histograms carry no symbol label: every label combination multiplies the bucket series
 ticks_ingestion_duration = Histogram(
     'ticks_ingestion_duration_seconds',
     'Time spent ingesting ticks',
+    buckets=[0.001, 0.005, 0.025, 0.1, 0.5]
+)
+
+ticks_dropped_total = Counter(
+    'ticks_dropped_total',
+    'Total number of generated ticks dropped because the publish queue was full',
     ['symbol']
 )
 
@@ -46,15 +79,15 @@ ohlc_queries_total = Counter(
 ohlc_query_duration = Histogram(
     'ohlc_query_duration_seconds',
     'Time spent querying OHLC data',
-    ['interval', 'symbol'],
-    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+    ['interval'],
+    buckets=[0.005, 0.025, 0.1, 0.5, 2.5]
 )
 
 ohlc_rows_returned = Histogram(
     'ohlc_rows_returned',
     'Number of OHLC rows returned',
-    ['interval', 'symbol'],
-    buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+    ['interval'],
+    buckets=[10, 100, 1000, 5000, 10000]
 )
 
 # WebSocket metrics
@@ -81,7 +114,7 @@ db_query_duration = Histogram(
     'db_query_duration_seconds',
     'Database query execution time',
     ['operation', 'table'],
-    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+    buckets=[0.001, 0.005, 0.025, 0.1, 0.5]
 )
 
 db_connection_pool_size = Gauge(
@@ -110,14 +143,16 @@ redis_messages_received = Counter(
 redis_pubsub_duration = Histogram(
     'redis_pubsub_duration_seconds',
     'Time spent in Redis pub/sub operations',
-    ['operation']
+    ['operation'],
+    buckets=[0.0005, 0.001, 0.005, 0.025, 0.1]
 )
 
 # TimescaleDB specific metrics
 continuous_aggregate_refresh_duration = Histogram(
     'continuous_aggregate_refresh_duration_seconds',
     'Time spent refreshing continuous aggregates',
-    ['aggregate_name']
+    ['aggregate_name'],
+    buckets=[0.1, 0.5, 2.5, 10.0, 60.0]
 )
 
 hypertable_chunks = Gauge(
@@ -150,7 +185,8 @@ application_errors_total = Counter(
 background_task_duration = Histogram(
     'background_task_duration_seconds',
     'Time spent in background tasks',
-    ['task_name']
+    ['task_name'],
+    buckets=[0.001, 0.005, 0.025, 0.1, 0.5]
 )
 
 background_task_errors = Counter(
@@ -184,3 +220,44 @@ ohlc_data_freshness = Gauge(
     'Age of the most recent OHLC data',
     ['interval', 'symbol']
 )
+
+
+def safe_labels(metric, **labels):
+    """
+    Return a labeled metric child with bounded label values.
+    
+    Unknown `symbol` and `reason` values are mapped to "other" so
+    free-form input cannot grow the number of series per metric.
+    """
+    if "symbol" in labels and labels["symbol"] not in ALLOWED_SYMBOLS:
+        labels["symbol"] = OTHER_LABEL
+    if "reason" in labels and labels["reason"] not in ALLOWED_REJECT_REASONS:
+        labels["reason"] = OTHER_LABEL
+    return metric.labels(**labels)
+
+
+def _by_symbol(metric, **labels) -> dict:
+    """Resolve one child per allowed symbol (plus "other") ahead of time."""
+    return {
+        symbol: metric.labels(symbol=symbol, **labels)
+        for symbol in ALLOWED_SYMBOLS | {OTHER_LABEL}
+    }
+
+
+def for_symbol(children: dict, symbol):
+    """Pick a pre-resolved child, falling back to the "other" series."""
+    return children.get(symbol) or children[OTHER_LABEL]
+
+
+# Pre-resolved children for per-event call sites: a dict lookup instead of .labels()
+DUPLICATE_TICKS = _by_symbol(duplicate_ticks_rejected)
+TICK_LAG = _by_symbol(tick_processing_lag)
+INVALID_TICKS = {
+    reason: _by_symbol(invalid_ticks_rejected, reason=reason.value)
+    for reason in RejectReason
+}
+
+
+def reject_tick(symbol, reason: RejectReason):
+    """Count a rejected tick under a bounded symbol and reason."""
+    for_symbol(INVALID_TICKS[reason], symbol).inc()
@@ -7,14 +7,79 @@ for efficient time-series storage and querying.
 from sqlalchemy import (
     Column,
     String,
-    Float,
+    Integer,
+    SmallInteger,
+    ForeignKey,
     Index,
     CheckConstraint,
 )
 from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
 
 
+# Prices are stored as integer units of 1e-5 (a tenth of a pip for EURUSD)
+PRICE_SCALE = 100_000
+# Representable price range: one unit up to the int4 maximum. Anything smaller
+# rounds to 0 (breaking positive_price), anything larger overflows the column
+MIN_PRICE = 1 / PRICE_SCALE
+MAX_PRICE = (2**31 - 1) / PRICE_SCALE
+
+
+def to_price_units(price: float) -> int:
+    """Convert a float price to the integer units stored in eurusd_ticks.price."""
+    return int(round(price * PRICE_SCALE))
+
+
+class ScaledPrice(TypeDecorator):
+    """
+    4-byte INTEGER column holding ``price * PRICE_SCALE``.
+    
+    Python code keeps working with floats; the conversion happens at bind
+    and result time so the table stores half the bytes of float8 and
+    aggregates exactly.
+    """
+    impl = Integer
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_price_units(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return value / PRICE_SCALE
+
+
+class Symbol(Base):
+    """
+    Currency pair lookup table.
+    
+    Ticks reference a symbol by its 2-byte id instead of repeating the code
+    on every row, which keeps the hypertable, its index and compressed
+    segments small.
+    """
+    __tablename__ = "symbols"
+    
+    id = Column(
+        SmallInteger,
+        primary_key=True,
+        autoincrement=True,
+        comment="Compact symbol id referenced by ticks"
+    )
+    code = Column(
+        String(10),
+        unique=True,
+        nullable=False,
+        comment="Currency pair code (e.g. EURUSD)"
+    )
+    
+    def __repr__(self):
+        return f"<Symbol(id={self.id}, code={self.code})>"
+
+
 class Tick(Base):
     """
     Raw tick data model - TimescaleDB hypertable for time-series storage.
@@ -30,22 +95,23 @@ class Tick(Base):
         nullable=False,
         comment="Timestamp of the tick (primary key, partitioned by TimescaleDB)"
     )
-    symbol = Column(
-        String(10),
+    symbol_id = Column(
+        SmallInteger,
+        ForeignKey("symbols.id"),
         primary_key=True,
         nullable=False,
-        default="EURUSD",
-        comment="Currency pair symbol"
+        comment="Currency pair (symbols.id)"
     )
     price = Column(
-        Float,
+        ScaledPrice,
         nullable=False,
-        comment="Price at this timestamp"
+        comment="Price at this timestamp, in units of 1/PRICE_SCALE"
     )
     
-    # Composite index for common query patterns
+    # Composite index for common query patterns; INCLUDE price so symbol +
+    # time range reads (GET /ticks/) can be answered by index-only scans
     __table_args__ = (
-        Index('idx_symbol_time', 'symbol', 'time'),
+        Index('idx_symbol_time', 'symbol_id', 'time', postgresql_include=['price']),
         CheckConstraint('price > 0', name='positive_price'),
         {
             'comment': 'Raw FX tick data - converted to TimescaleDB hypertable'
@@ -53,7 +119,7 @@ class Tick(Base):
     )
     
     def __repr__(self):
-        return f"<Tick(time={self.time}, symbol={self.symbol}, price={self.price})>"
+        return f"<Tick(time={self.time}, symbol_id={self.symbol_id}, price={self.price})>"
 
 
 # Note: OHLC aggregations are handled via TimescaleDB continuous aggregates
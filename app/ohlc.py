@@ -13,29 +13,186 @@ CQRS Benefits:
 - Independent from write complexity
 
 Data Flow:
-1. Writes happen via Redis Pub/Sub or POST /ticks/
+1. Writes happen via Redis Streams or POST /ticks/
 2. Data stored in eurusd_ticks hypertable
 3. Continuous aggregates auto-refresh (5s, 30s, 5min)
 4. These endpoints query aggregates (fast, pre-computed)
 5. Real-time mode merges materialized + raw data (zero lag)
 """
 import logging
+import time
+import msgspec
 from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi.responses import Response
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
 from app.database import get_db
-from app.schemas import OHLCResponse
+from app.models import PRICE_SCALE
+from app.schemas import OHLCResponse, OHLCRow
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ohlc", tags=["OHLC (Read-Only Queries)"])
 
+# Hot queries built once so SQLAlchemy's compiled cache and asyncpg's
+# prepared statement cache see the same SQL on every request
+_OHLC_QUERY = """
+    SELECT a.bucket, s.code AS symbol,
+           a.open::float8 / {scale} AS open, a.high::float8 / {scale} AS high,
+           a.low::float8 / {scale} AS low, a.close::float8 / {scale} AS close,
+           a.tick_count
+    FROM {table} a
+    JOIN symbols s ON s.id = a.symbol_id
+    WHERE a.bucket >= :start AND a.bucket < :end AND s.code = :symbol
+    ORDER BY a.bucket ASC
+    LIMIT :limit
+"""
+# interval -> (prepared statement, cache TTL in seconds)
+_INTERVAL_CFG = {
+    interval: (text(_OHLC_QUERY.format(table=f"eurusd_ohlc_{interval}", scale=PRICE_SCALE)), ttl)
+    for interval, ttl in (
+        ("minute", settings.OHLC_CACHE_TTL_MINUTE),
+        ("hour", settings.OHLC_CACHE_TTL_HOUR),
+        ("day", settings.OHLC_CACHE_TTL_DAY),
+    )
+}
+_CUSTOM_DAY_STMT = text("""
+    SELECT * FROM get_custom_day_ohlc(:start, :end, :day_start_hour)
+    WHERE symbol = :symbol
+    ORDER BY bucket ASC
+    LIMIT 3650
+""")
+
+# Rows fetched per server-side cursor round-trip when encoding a response
+_STREAM_CHUNK_ROWS = 2000
+
+_encode = msgspec.json.Encoder().encode
+
+
+class _ResponseCache:
+    """
+    In-process TTL cache of serialized OHLC responses.
+    
+    Stores the JSON bytes so hits skip both the query and serialization.
+    Entries simply expire; aggregate buckets only change on refresh.
+    """
+    
+    def __init__(self, max_entries: int):
+        self._entries: Dict[tuple, Tuple[float, bytes]] = {}
+        self._max_entries = max_entries
+    
+    def get(self, key: tuple) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return body
+    
+    def set(self, key: tuple, body: bytes, ttl: float):
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._entries) >= self._max_entries:
+            for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+                del self._entries[stale]
+            if len(self._entries) >= self._max_entries:
+                # Still full: evict the oldest insertion
+                del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + ttl, body)
+
+
+_ohlc_cache = _ResponseCache(settings.OHLC_CACHE_MAX_ENTRIES)
+
+
+def range_guard(max_days: int, example_start: str, example_end: str):
+    """
+    Build a dependency that parses and validates the start/end query range.
+    
+    Requires timezone-aware datetimes and rejects ranges longer than
+    max_days with a 400, returning (start, end) to the handler.
+    """
+    max_seconds = max_days * 86400
+    
+    def _guard(
+        start: datetime = Query(..., description="Start time in UTC (ISO 8601)", example=example_start),
+        end: datetime = Query(..., description="End time in UTC (ISO 8601)", example=example_end),
+    ) -> Tuple[datetime, datetime]:
+        if start.tzinfo is None or end.tzinfo is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Datetime must be timezone-aware (use 'Z' suffix for UTC or provide timezone offset)"
+            )
+        time_diff = (end - start).total_seconds()
+        if time_diff > max_seconds:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Time range too large. Maximum: {max_days} days. Your range: {time_diff / 86400:.1f} days"
+            )
+        return start, end
+    
+    return _guard
+
+
+MINUTE_RANGE = range_guard(7, "2025-12-04T17:00:00Z", "2025-12-04T18:00:00Z")
+HOUR_RANGE = range_guard(180, "2025-12-03T00:00:00Z", "2025-12-04T23:00:00Z")
+DAY_RANGE = range_guard(3650, "2025-12-01T00:00:00Z", "2025-12-04T00:00:00Z")
+CUSTOM_DAY_RANGE = range_guard(3650, "2025-12-01T00:00:00Z", "2025-12-05T00:00:00Z")
+
+
+async def _cached_ohlc(db: AsyncSession, stmt, params: dict, key: tuple, ttl: float) -> Response:
+    """
+    Run an OHLC query, or serve its JSON from the TTL cache.
+    
+    Returning a Response skips per-row OHLCResponse validation; the
+    response_model is kept on each route for the OpenAPI schema only.
+    UTC timestamps keep the 'Z' suffix Pydantic would produce.
+    
+    Rows are read through a server-side cursor and encoded a chunk at a
+    time, so only one chunk of Row objects is alive next to the output.
+    """
+    body = _ohlc_cache.get(key)
+    if body is None:
+        result = await db.stream(stmt, params, execution_options={"yield_per": _STREAM_CHUNK_ROWS})
+        # Positional OHLCRow structs encode ~3x faster than per-row dicts via orjson
+        chunks = []
+        async for rows in result.partitions():
+            chunks.append(_encode([OHLCRow(*row) for row in rows])[1:-1])
+        body = b"[" + b",".join(chunks) + b"]"
+        _ohlc_cache.set(key, body, ttl)
+    return Response(content=body, media_type="application/json")
+
+
+async def _query_ohlc(
+    interval: str,
+    time_range: Tuple[datetime, datetime],
+    symbol: str,
+    limit: int,
+    db: AsyncSession
+) -> Response:
+    """Serve one of the fixed-interval continuous aggregates."""
+    stmt, ttl = _INTERVAL_CFG[interval]
+    try:
+        start, end = time_range
+        return await _cached_ohlc(
+            db,
+            stmt,
+            {"start": start, "end": end, "symbol": symbol, "limit": limit},
+            key=(interval, symbol, start, end, limit),
+            ttl=ttl
+        )
+    except Exception as e:
+        logger.error(f"Error fetching {interval} OHLC: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.get("/minute", response_model=List[OHLCResponse])
 async def get_minute_ohlc(
-    start: datetime = Query(..., description="Start time in UTC (ISO 8601)", example="2025-12-04T17:00:00Z"),
-    end: datetime = Query(..., description="End time in UTC (ISO 8601)", example="2025-12-04T18:00:00Z"),
+    time_range: Tuple[datetime, datetime] = Depends(MINUTE_RANGE),
     symbol: str = Query("EURUSD", max_length=10),
     limit: int = Query(1000, ge=1, le=10000, description="Max number of rows to return (default: 1000, max: 10000)"),
     db: AsyncSession = Depends(get_db)
@@ -52,48 +209,12 @@ async def get_minute_ohlc(
     **Example**:
         GET /ohlc/minute?start=2025-12-04T17:00:00Z&end=2025-12-04T18:00:00Z&symbol=EURUSD
     """
-    try:
-        # Validate time range (max 7 days for minute data)
-        time_diff = (end - start).total_seconds()
-        max_minutes = 7 * 24 * 60  # 7 days in minutes
-        if time_diff > max_minutes * 60:  # Convert to seconds
-            raise HTTPException(
-                status_code=400,
-                detail=f"Time range too large. Maximum: 7 days ({max_minutes} minutes). Your range: {time_diff / 3600:.1f} hours"
-            )
-        
-        stmt = text("""
-            SELECT bucket, symbol, open, high, low, close, tick_count
-            FROM eurusd_ohlc_minute
-            WHERE bucket >= :start AND bucket < :end AND symbol = :symbol
-            ORDER BY bucket ASC
-            LIMIT :limit
-        """)
-        
-        result = await db. execute(stmt, {"start": start, "end": end, "symbol": symbol, "limit": limit})
-        rows = result.fetchall()
-        
-        return [
-            OHLCResponse(
-                bucket=row[0],
-                symbol=row[1],
-                open=row[2],
-                high=row[3],
-                low=row[4],
-                close=row[5],
-                tick_count=row[6]
-            )
-            for row in rows
-        ]
-    except Exception as e:
-        logger. error(f"Error fetching minute OHLC: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _query_ohlc("minute", time_range, symbol, limit, db)
 
 
 @router. get("/hour", response_model=List[OHLCResponse])
 async def get_hourly_ohlc(
-    start: datetime = Query(..., description="Start time in UTC (ISO 8601)", example="2025-12-03T00:00:00Z"),
-    end: datetime = Query(..., description="End time in UTC (ISO 8601)", example="2025-12-04T23:00:00Z"),
+    time_range: Tuple[datetime, datetime] = Depends(HOUR_RANGE),
     symbol: str = Query("EURUSD", max_length=10),
     limit: int = Query(1000, ge=1, le=10000, description="Max number of rows to return"),
     db: AsyncSession = Depends(get_db)
@@ -109,48 +230,12 @@ async def get_hourly_ohlc(
     **Example**:
         GET /ohlc/hour?start=2025-12-03T00:00:00Z&end=2025-12-04T00:00:00Z&symbol=EURUSD
     """
-    try:
-        # Validate time range (max 180 days for hourly data)
-        time_diff = (end - start).total_seconds()
-        max_hours = 180 * 24  # 180 days in hours
-        if time_diff > max_hours * 3600:  # Convert to seconds
-            raise HTTPException(
-                status_code=400,
-                detail=f"Time range too large. Maximum: 180 days ({max_hours} hours). Your range: {time_diff / 86400:.1f} days"
-            )
-        
-        stmt = text("""
-            SELECT bucket, symbol, open, high, low, close, tick_count
-            FROM eurusd_ohlc_hour
-            WHERE bucket >= :start AND bucket < :end AND symbol = :symbol
-            ORDER BY bucket ASC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(stmt, {"start": start, "end": end, "symbol": symbol, "limit": limit})
-        rows = result. fetchall()
-        
-        return [
-            OHLCResponse(
-                bucket=row[0],
-                symbol=row[1],
-                open=row[2],
-                high=row[3],
-                low=row[4],
-                close=row[5],
-                tick_count=row[6]
-            )
-            for row in rows
-        ]
-    except Exception as e:
-        logger.error(f"Error fetching hourly OHLC: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _query_ohlc("hour", time_range, symbol, limit, db)
 
 
 @router.get("/day", response_model=List[OHLCResponse])
 async def get_daily_ohlc(
-    start: datetime = Query(..., description="Start time in UTC (ISO 8601)", example="2025-12-01T00:00:00Z"),
-    end: datetime = Query(... , description="End time in UTC (ISO 8601)", example="2025-12-04T00:00:00Z"),
+    time_range: Tuple[datetime, datetime] = Depends(DAY_RANGE),
     symbol: str = Query("EURUSD", max_length=10),
     limit: int = Query(365, ge=1, le=3650, description="Max number of rows (default: 365 days, max: 10 years)"),
     db: AsyncSession = Depends(get_db)
@@ -166,48 +251,12 @@ async def get_daily_ohlc(
     **Example**:
         GET /ohlc/day?start=2025-12-01T00:00:00Z&end=2025-12-04T00:00:00Z&symbol=EURUSD
     """
-    try:
-        # Validate time range (max 10 years for daily data)
-        time_diff = (end - start).total_seconds()
-        max_days = 3650  # 10 years
-        if time_diff > max_days * 86400:  # Convert to seconds
-            raise HTTPException(
-                status_code=400,
-                detail=f"Time range too large. Maximum: 10 years ({max_days} days). Your range: {time_diff / 86400:.1f} days"
-            )
-        
-        stmt = text("""
-            SELECT bucket, symbol, open, high, low, close, tick_count
-            FROM eurusd_ohlc_day
-            WHERE bucket >= :start AND bucket < :end AND symbol = :symbol
-            ORDER BY bucket ASC
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(stmt, {"start": start, "end": end, "symbol": symbol, "limit": limit})
-        rows = result. fetchall()
-        
-        return [
-            OHLCResponse(
-                bucket=row[0],
-                symbol=row[1],
-                open=row[2],
-                high=row[3],
-                low=row[4],
-                close=row[5],
-                tick_count=row[6]
-            )
-            for row in rows
-        ]
-    except Exception as e:
-        logger.error(f"Error fetching daily OHLC: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return await _query_ohlc("day", time_range, symbol, limit, db)
 
 
 @router. get("/custom-day", response_model=List[OHLCResponse])
 async def get_custom_day_ohlc(
-    start: datetime = Query(..., description="Start time in UTC (ISO 8601 format: YYYY-MM-DDTHH:MM:SSZ)", example="2025-12-01T00:00:00Z"),
-    end: datetime = Query(..., description="End time in UTC (ISO 8601 format: YYYY-MM-DDTHH:MM:SSZ)", example="2025-12-05T00:00:00Z"),
+    time_range: Tuple[datetime, datetime] = Depends(CUSTOM_DAY_RANGE),
     day_start_hour: int = Query(22, ge=0, le=23, description="Hour when day starts in UTC (0-23). Example: 22 = 10 PM UTC"),
     symbol: str = Query("EURUSD", max_length=10),
     db: AsyncSession = Depends(get_db)
@@ -233,49 +282,19 @@ async def get_custom_day_ohlc(
     - Correct: 2025-12-01T00:00:00Z
     """
     try:
-        # Validate timezone awareness
-        if start.tzinfo is None or end.tzinfo is None:
-            raise HTTPException(
-                status_code=422,
-                detail="Datetime must be timezone-aware (use 'Z' suffix for UTC or provide timezone offset)"
-            )
-        
-        # Validate time range (max 10 years for daily data)
-        time_diff = (end - start).total_seconds()
-        max_days = 3650  # 10 years
-        if time_diff > max_days * 86400:  # Convert to seconds
-            raise HTTPException(
-                status_code=400,
-                detail=f"Time range too large. Maximum: 10 years ({max_days} days). Your range: {time_diff / 86400:.1f} days"
-            )
-        
-        stmt = text("""
-            SELECT * FROM get_custom_day_ohlc(:start, :end, :day_start_hour)
-            WHERE symbol = :symbol
-            ORDER BY bucket ASC
-            LIMIT 3650
-        """)
-        
-        result = await db.execute(stmt, {
-            "start": start,
-            "end": end,
-            "day_start_hour": day_start_hour,
-            "symbol": symbol
-        })
-        rows = result.fetchall()
-        
-        return [
-            OHLCResponse(
-                bucket=row[0],
-                symbol=row[1],
-                open=row[2],
-                high=row[3],
-                low=row[4],
-                close=row[5],
-                tick_count=row[6]
-            )
-            for row in rows
-        ]
+        start, end = time_range
+        return await _cached_ohlc(
+            db,
+            _CUSTOM_DAY_STMT,
+            {
+                "start": start,
+                "end": end,
+                "day_start_hour": day_start_hour,
+                "symbol": symbol
+            },
+            key=("custom-day", symbol, start, end, day_start_hour),
+            ttl=settings.OHLC_CACHE_TTL_DAY
+        )
     except Exception as e:
         logger.error(f"Error fetching custom day OHLC: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
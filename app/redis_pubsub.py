@@ -1,121 +1,323 @@
 """
-Redis Pub/Sub consumer for tick data ingestion.
+Redis stream consumer for tick data ingestion.
 
-Subscribes to Redis tick channel and persists incoming tick data to TimescaleDB.
-Uses INSERT ON CONFLICT for idempotent writes to handle duplicates safely.
+Reads the Redis tick stream through a consumer group and persists incoming
+tick data to TimescaleDB. Each XREADGROUP batch is written with a single
+multi-row INSERT ON CONFLICT DO NOTHING and one commit, keeping writes idempotent while
+amortizing round-trips and WAL flushes across the batch.
 """
 import asyncio
-import json
 import logging
-from datetime import datetime, timezone
+import os
+import socket
+import time
+from collections import Counter
+import ciso8601
+import orjson
+from typing import Optional
 from redis import asyncio as aioredis
-from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.config import settings
 from app.database import AsyncSessionLocal
+from app.models import MAX_PRICE, MIN_PRICE, Tick
+from app.symbols import symbol_registry
+from app.metrics import (
+    DUPLICATE_TICKS,
+    TICK_LAG,
+    RejectReason,
+    for_symbol,
+    reject_tick
+)
 
 logger = logging.getLogger(__name__)
 
+# Process-wide client for publish_tick, created on first use
+_redis: Optional[aioredis.Redis] = None
 
-async def publish_tick(tick_data: dict):
+
+def _get_redis() -> aioredis.Redis:
+    """Return the shared publisher client, creating its connection pool lazily."""
+    global _redis
+    # No lock needed: from_url() doesn't await, so creation can't interleave
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.redis_url_with_auth,
+            max_connections=settings.REDIS_MAX_CONNECTIONS
+        )
+    return _redis
+
+
+async def close_publisher():
+    """Close the shared publisher client and its connection pool."""
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
+
+
+async def publish_tick(payload: bytes):
     """
-    Publish a tick to Redis channel for WebSocket streaming.
+    Append an already-stored tick to the Redis stream for WebSocket streaming.
+    
+    The entry is tagged "persisted": every worker's listener broadcasts it,
+    while the consumer group acknowledges it without inserting it again.
     
     Args:
-        tick_data: Dictionary with 'time', 'symbol', 'price' keys
+        payload: JSON-encoded tick with 'time', 'symbol', 'price' keys
     """
     try:
-        redis_client = await aioredis.from_url(
-            settings.redis_url_with_auth,
-            decode_responses=True,
-            encoding="utf-8"
+        await _get_redis().xadd(
+            settings.TICK_STREAM,
+            {"data": payload, "persisted": 1},
+            maxlen=settings.TICK_STREAM_MAXLEN,
+            approximate=True
         )
-        await redis_client.publish(settings.TICK_CHANNEL, json.dumps(tick_data))
-        await redis_client.close()
     except Exception as e:
         logger.error(f"Failed to publish tick to Redis: {e}")
 
 
 class RedisTickConsumer:
-    """Consumer for tick data from Redis pub/sub."""
+    """Consumer for tick data from the Redis tick stream."""
     
     def __init__(self):
         self.redis_client = None
-        self.pubsub = None
         self.running = False
+        # Unique per worker process so each one gets its own share of the stream
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
     
-    async def connect(self):
-        """Connect to Redis."""
+    async def connect(self, pool: aioredis.ConnectionPool):
+        """Attach to the shared Redis connection pool and ensure the consumer group exists."""
         try:
-            self.redis_client = await aioredis.from_url(
-                settings.redis_url_with_auth,
-                decode_responses=True,
-                encoding="utf-8"
+            self.redis_client = aioredis.Redis(connection_pool=pool)
+            try:
+                await self.redis_client.xgroup_create(
+                    settings.TICK_STREAM,
+                    settings.TICK_CONSUMER_GROUP,
+                    id="0",
+                    mkstream=True
+                )
+            except aioredis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            logger.info(
+                f"Joined consumer group {settings.TICK_CONSUMER_GROUP} "
+                f"on Redis stream: {settings.TICK_STREAM}"
             )
-            self.pubsub = self.redis_client.pubsub()
-            await self.pubsub.subscribe(settings.TICK_CHANNEL)
-            logger.info(f"Subscribed to Redis channel: {settings.TICK_CHANNEL}")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
     async def consume_ticks(self):
-        """Consume ticks from Redis and insert into database."""
+        """
+        Consume ticks from the Redis stream and insert them into the database.
+        
+        A reader pulls up to CONSUMER_BATCH_SIZE entries per XREADGROUP call
+        onto a bounded queue; CONSUMER_WORKERS workers write each batch in one
+        transaction and acknowledge it afterwards, so inserts overlap.
+        """
         self.running = True
         logger.info("Starting tick consumer...")
         
+        # Bounded so a slow database pushes back on XREADGROUP instead of buffering
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.CONSUMER_WORKERS * 2)
+        workers = [
+            asyncio.create_task(self._insert_worker(queue))
+            for _ in range(settings.CONSUMER_WORKERS)
+        ]
+        
         try:
-            async for message in self.pubsub.listen():
-                if not self.running:
-                    break
-                
-                if message["type"] == "message":
-                    try:
-                        tick_data = json.loads(message["data"])
-                        await self._insert_tick(tick_data)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Invalid JSON in tick: {e}")
-                    except Exception as e:
-                        logger. error(f"Error processing tick: {e}")
+            await self._read_batches(queue)
         except Exception as e:
             logger. error(f"Consumer error: {e}")
         finally:
+            # Let workers finish queued batches, then stop them
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers, return_exceptions=True)
             await self.disconnect()
     
-    async def _insert_tick(self, tick_data: dict):
-        """Insert tick into database."""
-        async with AsyncSessionLocal() as session:
+    async def _read_batches(self, queue: asyncio.Queue):
+        """Read entries for this consumer from the stream and queue them by batch."""
+        claim_interval = settings.CONSUMER_CLAIM_IDLE_MS / 1000
+        next_claim = 0.0
+        while self.running:
+            if time.monotonic() >= next_claim:
+                try:
+                    await self._claim_stale(queue)
+                except Exception as e:
+                    # Reclaiming is retried next interval; never stop consuming over it
+                    logger.error("Error reclaiming pending stream entries: %s", e)
+                next_claim = time.monotonic() + claim_interval
+            
+            response = await self.redis_client.xreadgroup(
+                settings.TICK_CONSUMER_GROUP,
+                self.consumer_name,
+                {settings.TICK_STREAM: ">"},
+                count=settings.CONSUMER_BATCH_SIZE,
+                block=1000
+            )
+            for _stream, messages in response:
+                if messages:
+                    await queue.put(messages)
+    
+    async def _claim_stale(self, queue: asyncio.Queue):
+        """
+        Take over entries delivered but never acknowledged.
+        
+        Consumer names change with every process, so entries left pending by
+        a crashed worker or a failed batch are only redelivered this way.
+        Inserts ignore duplicates, which makes the retry safe.
+        """
+        start_id = "0-0"
+        while self.running:
+            response = await self.redis_client.xautoclaim(
+                settings.TICK_STREAM,
+                settings.TICK_CONSUMER_GROUP,
+                self.consumer_name,
+                min_idle_time=settings.CONSUMER_CLAIM_IDLE_MS,
+                start_id=start_id,
+                count=settings.CONSUMER_BATCH_SIZE
+            )
+            start_id, claimed = response[0], response[1]
+            messages = [(message_id, fields) for message_id, fields in claimed if fields]
+            # Redis 7 already drops trimmed entries from the pending list (and
+            # returns them in response[2]); Redis 6.2 returns them here without
+            # fields, sometimes as (None, None), so ack only those with an id
+            trimmed = [message_id for message_id, fields in claimed if message_id is not None and not fields]
+            if trimmed:
+                await self.redis_client.xack(settings.TICK_STREAM, settings.TICK_CONSUMER_GROUP, *trimmed)
+            if messages:
+                logger.warning("Reclaimed %s pending stream entries", len(messages))
+                await queue.put(messages)
+            if start_id == b"0-0":
+                return
+    
+    async def _insert_worker(self, queue: asyncio.Queue):
+        """Persist and acknowledge queued batches until a None sentinel arrives."""
+        while True:
+            messages = await queue.get()
+            if messages is None:
+                return
+            
             try:
-                # Parse timestamp string to datetime if needed
-                time_value = tick_data["time"]
-                if isinstance(time_value, str):
-                    time_value = datetime.fromisoformat(time_value.replace('Z', '+00:00'))
+                rows = []
+                for _message_id, fields in messages:
+                    if b"persisted" in fields:
+                        continue  # Written by the API already; only broadcast
+                    row = self._parse_tick(fields)
+                    if row is not None:
+                        rows.append(row)
                 
-                # Use INSERT ... ON CONFLICT for idempotency
-                stmt = text("""
-                    INSERT INTO eurusd_ticks (time, symbol, price)
-                    VALUES (:time, :symbol, :price)
-                    ON CONFLICT (time, symbol) DO UPDATE 
-                    SET price = EXCLUDED.price
-                """)
+                if rows:
+                    self._record_lag(rows)
+                    await self._insert_ticks(rows)
                 
-                await session.execute(stmt, {
-                    "time": time_value,
-                    "symbol": tick_data.get("symbol", "EURUSD"),
-                    "price": tick_data["price"]
-                })
+                # Only after the insert committed: a failed batch stays pending
+                # and is retried by _claim_stale
+                await self.redis_client.xack(
+                    settings.TICK_STREAM,
+                    settings.TICK_CONSUMER_GROUP,
+                    *(message_id for message_id, _fields in messages)
+                )
+            except Exception as e:
+                logger.error("Error processing batch of %d ticks, left pending: %s", len(messages), e)
+    
+    def _record_lag(self, rows: list):
+        """Set tick_processing_lag from the newest tick per symbol in a batch."""
+        newest = {}
+        for row in rows:
+            newest[row["symbol"]] = row["time"]
+        
+        now = time.time()
+        for symbol, tick_time in newest.items():
+            if tick_time.tzinfo is not None:
+                for_symbol(TICK_LAG, symbol).set(now - tick_time.timestamp())
+    
+    def _parse_tick(self, fields: dict):
+        """
+        Decode and validate one stream entry.
+        
+        Returns a row dict for insertion, or None if the tick is rejected.
+        Invalid rows are filtered here so one bad tick can't fail the batch.
+        """
+        try:
+            tick_data = orjson.loads(fields[b"data"])
+        except (KeyError, orjson.JSONDecodeError) as e:
+            logger.error("Invalid JSON in tick: %s", e)
+            reject_tick(None, RejectReason.BAD_JSON)
+            return None
+        if not isinstance(tick_data, dict):
+            logger.error("Invalid JSON in tick: expected an object, got %r", tick_data)
+            reject_tick(None, RejectReason.BAD_JSON)
+            return None
+        
+        symbol = tick_data.get("symbol", "EURUSD")
+        if not isinstance(symbol, str) or not 0 < len(symbol) <= 10:
+            logger.error("Invalid symbol in tick: %s", tick_data)
+            reject_tick(None, RejectReason.BAD_SYMBOL)
+            return None
+        
+        try:
+            # Parse timestamp string to datetime if needed (C parser, accepts "Z")
+            time_value = tick_data["time"]
+            if isinstance(time_value, str):
+                time_value = ciso8601.parse_datetime(time_value)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error("Invalid time in tick: %s", e)
+            reject_tick(symbol, RejectReason.BAD_TIME)
+            return None
+        
+        price = tick_data.get("price")
+        if not isinstance(price, (int, float)) or price <= 0:
+            logger.error("Invalid price in tick: %s", tick_data)
+            reject_tick(symbol, RejectReason.NON_POSITIVE)
+            return None
+        if not MIN_PRICE <= price <= MAX_PRICE:
+            # Would round to 0 or overflow the INTEGER column and fail the whole batch
+            logger.error("Price out of storable range in tick: %s", tick_data)
+            reject_tick(symbol, RejectReason.OUT_OF_RANGE)
+            return None
+        
+        return {"time": time_value, "symbol": symbol, "price": price}
+    
+    async def _insert_ticks(self, rows: list):
+        """
+        Insert a batch of ticks in a single statement and transaction.
+        
+        Ticks are immutable, so an existing (time, symbol) row is kept as-is;
+        DO NOTHING avoids writing a new tuple and WAL record for a duplicate.
+        Errors propagate so the caller leaves the batch unacknowledged.
+        """
+        async with AsyncSessionLocal() as session:
+            try:
+                symbol_ids = await symbol_registry.get_or_create_ids(row["symbol"] for row in rows)
+                values = [
+                    {"time": row["time"], "symbol_id": symbol_ids[row["symbol"]], "price": row["price"]}
+                    for row in rows
+                ]
+                stmt = pg_insert(Tick).values(values).on_conflict_do_nothing(
+                    index_elements=[Tick.time, Tick.symbol_id]
+                ).returning(Tick.symbol_id)
+                
+                result = await session.execute(stmt)
+                # Rows missing from RETURNING hit the conflict and were skipped
+                duplicates = Counter(value["symbol_id"] for value in values)
+                duplicates.subtract(result.scalars().all())
                 await session.commit()
-                logger.debug(f"Inserted tick: {tick_data}")
+                logger.debug("Inserted %d ticks", len(rows))
                 
-            except Exception as e:
+                codes = {symbol_id: code for code, symbol_id in symbol_ids.items()}
+                for symbol_id, count in duplicates.items():
+                    if count > 0:
+                        for_symbol(DUPLICATE_TICKS, codes[symbol_id]).inc(count)
+                
+            except Exception:
                 await session.rollback()
-                logger.error(f"Error inserting tick: {e}")
+                raise
     
     async def disconnect(self):
         """Disconnect from Redis."""
         self.running = False
-        if self.pubsub:
-            await self.pubsub.unsubscribe(settings.TICK_CHANNEL)
-            await self.pubsub.close()
         if self.redis_client:
             await self.redis_client. close()
         logger.info("Disconnected from Redis")
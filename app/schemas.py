@@ -4,21 +4,24 @@ Pydantic schemas for request/response validation.
 Provides type validation and serialization for API endpoints,
 preventing invalid data from entering the system.
 """
+import msgspec
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from typing import Optional
 
+from app.models import MAX_PRICE, MIN_PRICE
+
 
 class TickCreate(BaseModel):
     """Schema for creating a new tick."""
     time: datetime
     symbol: str = Field(default="EURUSD", max_length=10)
-    price: float = Field(gt=0, description="Price must be positive")
+    price: float = Field(ge=MIN_PRICE, le=MAX_PRICE, description="Price must be positive and fit the stored scale")
 
 
 class TickUpdate(BaseModel):
     """Schema for updating a tick."""
-    price: float = Field(gt=0, description="Updated price must be positive")
+    price: float = Field(ge=MIN_PRICE, le=MAX_PRICE, description="Updated price must be positive and fit the stored scale")
 
 
 class TickResponse(BaseModel):
@@ -30,6 +33,17 @@ class TickResponse(BaseModel):
     price: float
 
 
+class TickRow(msgspec.Struct):
+    """
+    Slotted tick row used to encode tick responses.
+    
+    TickResponse remains the documented schema; field order matches it.
+    """
+    time: datetime
+    symbol: str
+    price: float
+
+
 class OHLCResponse(BaseModel):
     """Schema for OHLC response."""
     model_config = ConfigDict(from_attributes=True)
@@ -43,6 +57,35 @@ class OHLCResponse(BaseModel):
     tick_count: int
 
 
+class OHLCRow(msgspec.Struct):
+    """
+    Slotted OHLC row used to encode query results.
+    
+    Built positionally from result tuples, so field order must match the
+    OHLC SELECT column order. OHLCResponse remains the documented schema.
+    """
+    bucket: datetime
+    symbol: str
+    open: float
+    high: float
+    low: float
+    close: float
+    tick_count: int
+
+
+class OHLCFrame(msgspec.Struct):
+    """Latest OHLC bucket pushed to WebSocket OHLC subscribers."""
+    interval: str
+    bucket: datetime
+    symbol: str
+    open: float
+    high: float
+    low: float
+    close: float
+    tick_count: int
+    timestamp: datetime
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
@@ -0,0 +1,57 @@
+"""
+Symbol registry mapping currency pair codes to compact ids.
+
+Ticks store a SMALLINT symbol_id; codes are resolved through a per-process
+cache backed by the symbols table. Unknown codes are registered in their own
+short transaction so a rolled-back request can't leave a stale id cached.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.database import AsyncSessionLocal
+from app.models import Symbol
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolRegistry:
+    """Cache of symbol code -> id, filled from the symbols table on demand."""
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+    
+    async def get_id(self, code: str) -> Optional[int]:
+        """Return the id for a code, or None if no tick was ever stored for it."""
+        symbol_id = self._ids.get(code)
+        if symbol_id is None:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(select(Symbol.id).where(Symbol.code == code))
+                symbol_id = result.scalar_one_or_none()
+            if symbol_id is not None:
+                self._ids[code] = symbol_id
+        return symbol_id
+    
+    async def get_or_create_ids(self, codes: Iterable[str]) -> Dict[str, int]:
+        """Return ids for all codes, registering any that don't exist yet."""
+        codes = set(codes)
+        missing = [code for code in codes if code not in self._ids]
+        if missing:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    pg_insert(Symbol)
+                    .values([{"code": code} for code in missing])
+                    .on_conflict_do_nothing(index_elements=[Symbol.code])
+                )
+                result = await session.execute(
+                    select(Symbol.code, Symbol.id).where(Symbol.code.in_(missing))
+                )
+                resolved = result.tuples().all()
+                await session.commit()
+            self._ids.update(resolved)
+            logger.debug("Resolved symbols: %s", missing)
+        return {code: self._ids[code] for code in codes}
+
+
+# Global registry instance
+symbol_registry = SymbolRegistry()
@@ -0,0 +1,262 @@
+// Element refs, looked up once (the script is deferred, so the DOM is parsed)
+const messagesEl = document.getElementById('messages');
+const messageCountEl = document.getElementById('messageCount');
+const avgPriceEl = document.getElementById('avgPrice');
+const minPriceEl = document.getElementById('minPrice');
+const maxPriceEl = document.getElementById('maxPrice');
+const statusEl = document.getElementById('status');
+const connectBtn = document.getElementById('connectBtn');
+const disconnectBtn = document.getElementById('disconnectBtn');
+const binaryToggle = document.getElementById('binaryToggle');
+
+let ws = null;
+let selectedEndpoint = 'ticks';
+let messageCount = 0;
+// Running price statistics, updated in O(1) per message
+let priceSum = 0, priceCount = 0, minPrice = Infinity, maxPrice = -Infinity;
+// Tick price / OHLC close, read straight from the frame text
+const PRICE_RE = /"(?:price|close)":(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)/g;
+
+// Minimal MessagePack decoder for the server's binary frames
+// (maps, arrays, strings, numbers, booleans and nil)
+const utf8 = new TextDecoder();
+function decodeMsgpack(bytes) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    let pos = 0;
+    const str = (n) => utf8.decode(bytes.subarray(pos, pos += n));
+    const arr = (n) => {
+        const out = new Array(n);
+        for (let i = 0; i < n; i++) out[i] = read();
+        return out;
+    };
+    const map = (n) => {
+        const out = {};
+        for (let i = 0; i < n; i++) {
+            const key = read();
+            out[key] = read();
+        }
+        return out;
+    };
+    function read() {
+        const b = bytes[pos++];
+        if (b <= 0x7f) return b;
+        if (b >= 0xe0) return b - 0x100;
+        if ((b & 0xf0) === 0x80) return map(b & 0x0f);
+        if ((b & 0xf0) === 0x90) return arr(b & 0x0f);
+        if ((b & 0xe0) === 0xa0) return str(b & 0x1f);
+        let v;
+        switch (b) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+            case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+            case 0xcc: return bytes[pos++];
+            case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+            case 0xce: v = view.getUint32(pos); pos += 4; return v;
+            case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+            case 0xd0: return view.getInt8(pos++);
+            case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+            case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+            case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+            case 0xd9: return str(bytes[pos++]);
+            case 0xda: v = view.getUint16(pos); pos += 2; return str(v);
+            case 0xdb: v = view.getUint32(pos); pos += 4; return str(v);
+            case 0xdc: v = view.getUint16(pos); pos += 2; return arr(v);
+            case 0xdd: v = view.getUint32(pos); pos += 4; return arr(v);
+            case 0xde: v = view.getUint16(pos); pos += 2; return map(v);
+            case 0xdf: v = view.getUint32(pos); pos += 4; return map(v);
+        }
+        throw new Error(`Unsupported MessagePack type 0x${b.toString(16)}`);
+    }
+    return read();
+}
+
+function trackPrice(price) {
+    priceSum += price;
+    priceCount++;
+    if (price < minPrice) minPrice = price;
+    if (price > maxPrice) maxPrice = price;
+}
+
+function selectEndpoint(endpoint) {
+    selectedEndpoint = endpoint;
+    document.querySelectorAll('.endpoint-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    event.target.closest('.endpoint-btn').classList.add('active');
+    
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        disconnect();
+        addMessage('info', `Switched to ${endpoint} endpoint. Click Connect to reconnect.`);
+    }
+}
+
+function connect() {
+    const wsUrl = `ws://${window.location.host}/ws/${selectedEndpoint}`;
+    addMessage('info', `Connecting to ${wsUrl}...`);
+    
+    // With MessagePack the server sends binary frames instead of JSON text
+    const binary = binaryToggle.checked;
+    ws = binary ? new WebSocket(wsUrl, 'msgpack') : new WebSocket(wsUrl);
+    ws.binaryType = 'arraybuffer';
+    
+    ws.onopen = () => {
+        addMessage('success', 'Connected successfully!');
+        updateStatus(true);
+        connectBtn.disabled = true;
+        disconnectBtn.disabled = false;
+    };
+    
+    ws.onmessage = (event) => {
+        if (typeof event.data !== 'string') {
+            // Binary frames decode straight from the ArrayBuffer
+            const parsed = decodeMsgpack(new Uint8Array(event.data));
+            const items = Array.isArray(parsed) ? parsed : [parsed];
+            for (const data of items) {
+                const price = data.price ?? data.close;
+                if (typeof price === 'number') trackPrice(price);
+            }
+            messageCount += items.length;
+            addMessage('data', items);
+            return;
+        }
+        
+        // Statistics come from a regex scan of the frame; JSON.parse
+        // only runs for frames that actually get rendered
+        let frameCount = 0;
+        for (const match of event.data.matchAll(PRICE_RE)) {
+            trackPrice(+match[1]);
+            frameCount++;
+        }
+        messageCount += frameCount || 1;
+        
+        addMessage('data', event.data);
+    };
+    
+    ws.onerror = (error) => {
+        addMessage('error', 'WebSocket error occurred');
+        console.error('WebSocket error:', error);
+    };
+    
+    ws.onclose = () => {
+        addMessage('info', '🔌 Disconnected');
+        updateStatus(false);
+        connectBtn.disabled = false;
+        disconnectBtn.disabled = true;
+    };
+}
+
+function disconnect() {
+    if (ws) {
+        ws.close();
+        ws = null;
+    }
+}
+
+function updateStatus(connected) {
+    if (connected) {
+        statusEl.className = 'status connected';
+        statusEl.innerHTML = '<span class="pulse"></span><span>Connected</span>';
+    } else {
+        statusEl.className = 'status disconnected';
+        statusEl.innerHTML = '<span class="pulse"></span><span>Disconnected</span>';
+    }
+}
+
+function updateStats() {
+    messageCountEl.textContent = messageCount;
+    
+    if (priceCount > 0) {
+        avgPriceEl.textContent = (priceSum / priceCount).toFixed(5);
+        minPriceEl.textContent = minPrice.toFixed(5);
+        maxPriceEl.textContent = maxPrice.toFixed(5);
+    }
+}
+
+// Messages are queued and rendered once per animation frame; the log
+// keeps only the newest MAX_MESSAGES rows
+const MAX_MESSAGES = 500;
+let pendingMessages = [];
+let flushScheduled = false;
+// Same output as toLocaleTimeString(), without resolving locale options per call
+const timeFormat = new Intl.DateTimeFormat(undefined, {hour: 'numeric', minute: '2-digit', second: '2-digit'});
+
+function addMessage(type, content) {
+    // Only the arrival time is recorded here; rendered rows are formatted at flush
+    pendingMessages.push({type, content, time: Date.now()});
+    if (!flushScheduled) {
+        flushScheduled = true;
+        requestAnimationFrame(flushMessages);
+    }
+}
+
+function createSpan(className, text) {
+    const span = document.createElement('span');
+    span.className = className;
+    span.textContent = text;
+    return span;
+}
+
+function flushMessages() {
+    flushScheduled = false;
+    const fragment = document.createDocumentFragment();
+    
+    // Walk back from the newest message so rows (and data frames)
+    // that would be trimmed straight away are never built or parsed
+    const rows = [];
+    for (let i = pendingMessages.length - 1; i >= 0 && rows.length < MAX_MESSAGES; i--) {
+        const {type, content, time} = pendingMessages[i];
+        const texts = type === 'data' ? formatFrame(content) : [content];
+        const label = timeFormat.format(time);
+        for (let j = texts.length - 1; j >= 0 && rows.length < MAX_MESSAGES; j--) {
+            rows.push({type, content: texts[j], time: label});
+        }
+    }
+    
+    for (const {type, content, time} of rows.reverse()) {
+        const messageEl = document.createElement('div');
+        messageEl.className = 'message';
+        const isJson = content.startsWith('{') || content.startsWith('[');
+        messageEl.append(
+            createSpan('message-time', `[${time}]`),
+            createSpan(`message-type ${type}`, type.toUpperCase()),
+            createSpan(`message-content ${isJson ? 'json' : ''}`, content)
+        );
+        fragment.appendChild(messageEl);
+    }
+    pendingMessages = [];
+    
+    messagesEl.appendChild(fragment);
+    while (messagesEl.childElementCount > MAX_MESSAGES) {
+        messagesEl.firstElementChild.remove();
+    }
+    messagesEl.scrollTop = messagesEl.scrollHeight;
+    updateStats();
+}
+
+function formatFrame(frame) {
+    // /ws/ticks batches ticks into arrays; OHLC frames are single objects.
+    // Binary frames arrive here already decoded
+    const parsed = typeof frame === 'string' ? JSON.parse(frame) : frame;
+    return (Array.isArray(parsed) ? parsed : [parsed]).map((data) => JSON.stringify(data, null, 2));
+}
+
+function clearMessages() {
+    messagesEl.replaceChildren();
+    pendingMessages = [];
+    messageCount = 0;
+    priceSum = 0;
+    priceCount = 0;
+    minPrice = Infinity;
+    maxPrice = -Infinity;
+    updateStats();
+    avgPriceEl.textContent = '-';
+    minPriceEl.textContent = '-';
+    maxPriceEl.textContent = '-';
+}
+
+// Auto-connect on page load
+window.addEventListener('load', () => {
+    addMessage('info', 'WebSocket test console ready. Click Connect to start.');
+});
@@ -9,7 +9,7 @@ Primary Use Cases:
 - Data Correction: Update/delete erroneous ticks
 
 Production Notes:
-- Primary ingestion: Redis Pub/Sub (internal, automated, 1000s ticks/sec)
+- Primary ingestion: Redis Streams (internal, automated, 1000s ticks/sec)
 - Secondary ingestion: These APIs (manual, external, lower throughput)
 - Warning: Modifying historical tick data affects OHLC aggregates
 - Recommendation: Use for testing/backfill, not real-time production ingestion
@@ -20,19 +20,76 @@ CQRS Benefits:
 - Flexibility: Multiple write sources (Redis + API)
 - Performance: Writes don't block OHLC queries
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime, timezone
+import msgspec
 from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy import select, delete, update, and_
+from fastapi.responses import Response
+from sqlalchemy import Float, Integer, select, delete, update, and_, bindparam, text, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
-from app.models import Tick
-from app.schemas import TickCreate, TickUpdate, TickResponse
+from app.models import PRICE_SCALE, Tick, to_price_units
+from app.schemas import TickCreate, TickUpdate, TickResponse, TickRow
 from app.redis_pubsub import publish_tick
+from app.symbols import symbol_registry
+from app.websocket import manager
 
 router = APIRouter(prefix="/ticks", tags=["Tick Management"])
 
+# Bulk requests at least this large are written with COPY instead of INSERT
+_COPY_MIN_ROWS = 100
+# Rows per COPY; Postgres throughput flattens out beyond ~10k rows per batch
+_COPY_CHUNK_ROWS = 10_000
+# Transaction-local staging table for ?mode=backfill
+_STAGE_TABLE = "eurusd_ticks_stage"
+_CREATE_STAGE = text(
+    f"CREATE TEMP TABLE {_STAGE_TABLE} (LIKE {Tick.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+)
+_MERGE_STAGE = text(
+    f"INSERT INTO {Tick.__tablename__} (time, symbol_id, price) "
+    f"SELECT time, symbol_id, price FROM {_STAGE_TABLE} "
+    "ON CONFLICT DO NOTHING"
+)
+# Rows fetched per server-side cursor round-trip in GET /ticks/
+_STREAM_CHUNK_ROWS = 2000
+
+_encode = msgspec.json.Encoder().encode
+
+# Recurring statements built once; values are bound at execute time
+# Price is scaled back to float8 in Postgres so rows skip the ScaledPrice result processor
+_SELECT_TICKS = (
+    select(Tick.time, (type_coerce(Tick.price, Integer).cast(Float) / float(PRICE_SCALE)).label("price"))
+    .where(and_(
+        Tick.symbol_id == bindparam("symbol_id"),
+        Tick.time >= bindparam("start"),
+        Tick.time < bindparam("end")
+    ))
+    .order_by(Tick.time.asc())
+    .limit(bindparam("limit"))
+)
+_UPDATE_PRICE = (
+    update(Tick)
+    .where(and_(Tick.time == bindparam("tick_time"), Tick.symbol_id == bindparam("tick_symbol_id")))
+    .values(price=bindparam("new_price"))
+    .returning(Tick.time, Tick.price)
+)
+_DELETE_RANGE = delete(Tick).where(and_(
+    Tick.symbol_id == bindparam("symbol_id"),
+    Tick.time >= bindparam("start"),
+    Tick.time < bindparam("end")
+))
+# Drops whole 1-day chunks (every symbol) as a metadata-only operation
+_DROP_CHUNKS = text(
+    f"SELECT drop_chunks('{Tick.__tablename__}', "
+    "older_than => CAST(:end AS timestamptz), newer_than => CAST(:start AS timestamptz))"
+)
+_DELETE_ONE = delete(Tick).where(and_(
+    Tick.symbol_id == bindparam("symbol_id"),
+    Tick.time == bindparam("tick_time")
+))
+
 
 @router.post("/", response_model=TickResponse, status_code=201)
 async def create_tick(
@@ -47,7 +104,7 @@ async def create_tick(
     - External data feed integration
     - Historical data backfill
     
-    **Note:** In production, ticks are ingested via Redis Pub/Sub.
+    **Note:** In production, ticks are ingested via Redis Streams.
     This endpoint allows manual insertion when needed.
     
     **Example:**
@@ -61,42 +118,87 @@ async def create_tick(
     """
     try:
         # Create tick object
+        symbol_ids = await symbol_registry.get_or_create_ids([tick.symbol])
         db_tick = Tick(
             time=tick.time,
-            symbol=tick.symbol,
+            symbol_id=symbol_ids[tick.symbol],
             price=tick.price
         )
         
-        # Add to database
+        # Add to database; no refresh needed, the response comes from the input
         db.add(db_tick)
         await db.commit()
-        await db.refresh(db_tick)
         
-        # Publish to Redis for WebSocket streaming (optional)
+        # Serialize once; the same bytes feed the stream and the response.
+        # Echo the price as stored (rounded to PRICE_SCALE units)
+        payload = _encode(TickRow(tick.time, tick.symbol, to_price_units(tick.price) / PRICE_SCALE))
+        
+        # Stream to WebSocket clients (optional). A single worker owns every
+        # socket, so broadcast in-process; otherwise fan out through Redis
+        # (tagged persisted, so the consumer group doesn't insert it again)
         try:
-            await publish_tick({
-                "time": tick.time.isoformat(),
-                "symbol": tick.symbol,
-                "price": tick.price
-            })
+            if settings.WEB_CONCURRENCY > 1:
+                await publish_tick(payload)
+            else:
+                await manager.send_tick(payload.decode())
         except Exception as e:
-            # Redis publish is optional, don't fail the request
+            # Streaming is optional, don't fail the request
             pass
         
-        return TickResponse(
-            time=db_tick.time,
-            symbol=db_tick.symbol,
-            price=db_tick.price
-        )
+        return Response(content=payload, status_code=201, media_type="application/json")
         
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=f"Failed to create tick: {str(e)}")
 
 
+async def _copy_ticks(
+    db: AsyncSession,
+    ticks: List[TickCreate],
+    symbol_ids: dict,
+    table: str = Tick.__tablename__
+):
+    """
+    Write ticks with COPY on the session's connection.
+    
+    Runs inside the session transaction, so the caller's commit/rollback
+    still applies. COPY bypasses SQLAlchemy types, so prices are scaled here.
+    Records are built and sent one chunk at a time to bound memory.
+    """
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    for offset in range(0, len(ticks), _COPY_CHUNK_ROWS):
+        await raw.driver_connection.copy_records_to_table(
+            table,
+            records=[
+                (tick.time, symbol_ids[tick.symbol], to_price_units(tick.price))
+                for tick in ticks[offset:offset + _COPY_CHUNK_ROWS]
+            ],
+            columns=["time", "symbol_id", "price"]
+        )
+
+
+async def _backfill_ticks(db: AsyncSession, ticks: List[TickCreate], symbol_ids: dict) -> int:
+    """
+    COPY ticks into a transaction-local staging table, then merge them.
+    
+    The temp table isn't WAL-logged and is dropped at commit. Merging with
+    ON CONFLICT DO NOTHING makes a backfill safe to re-run over ticks that
+    already exist. Returns the number of rows actually inserted.
+    """
+    await db.execute(_CREATE_STAGE)
+    await _copy_ticks(db, ticks, symbol_ids, table=_STAGE_TABLE)
+    result = await db.execute(_MERGE_STAGE)
+    return result.rowcount
+
+
 @router.post("/bulk", response_model=dict, status_code=201)
 async def create_ticks_bulk(
     ticks: List[TickCreate],
+    mode: Literal["insert", "backfill"] = Query(
+        "insert",
+        description="insert: fail on duplicates; backfill: stage and skip ticks that already exist"
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -123,21 +225,33 @@ async def create_ticks_bulk(
         "message": "Successfully created 3 ticks"
     }
     ```
+    
+    With `?mode=backfill`, ticks that already exist are skipped instead of
+    failing the request, and `created` counts only the new ones.
     """
     try:
-        # Create tick objects
-        db_ticks = [
-            Tick(time=tick.time, symbol=tick.symbol, price=tick.price)
-            for tick in ticks
-        ]
+        symbol_ids = await symbol_registry.get_or_create_ids(tick.symbol for tick in ticks)
+        
+        if mode == "backfill":
+            created = await _backfill_ticks(db, ticks, symbol_ids)
+            await db.commit()
+            return {
+                "created": created,
+                "message": f"Backfilled {created} ticks ({len(ticks) - created} already existed)"
+            }
         
-        # Bulk insert
-        db.add_all(db_ticks)
+        if len(ticks) >= _COPY_MIN_ROWS:
+            await _copy_ticks(db, ticks, symbol_ids)
+        else:
+            db.add_all([
+                Tick(time=tick.time, symbol_id=symbol_ids[tick.symbol], price=tick.price)
+                for tick in ticks
+            ])
         await db.commit()
         
         return {
-            "created": len(db_ticks),
-            "message": f"Successfully created {len(db_ticks)} ticks"
+            "created": len(ticks),
+            "message": f"Successfully created {len(ticks)} ticks"
         }
         
     except Exception as e:
@@ -169,21 +283,23 @@ async def get_ticks(
     **Returns:** Array of tick objects with time, symbol, price
     """
     try:
-        query = select(Tick).where(
-            and_(
-                Tick.symbol == symbol,
-                Tick.time >= start,
-                Tick.time < end
-            )
-        ).order_by(Tick.time.asc()).limit(limit)
-        
-        result = await db.execute(query)
-        ticks = result.scalars().all()
+        symbol_id = await symbol_registry.get_id(symbol)
+        if symbol_id is None:
+            return []
         
-        return [
-            TickResponse(time=tick.time, symbol=tick.symbol, price=tick.price)
-            for tick in ticks
-        ]
+        # Select plain columns: no ORM identity-map bookkeeping per row.
+        # Server-side cursor: only one chunk of rows is alive at a time, and
+        # each is encoded straight to bytes. Returning a Response skips
+        # per-row TickResponse validation (response_model stays for OpenAPI)
+        result = await db.stream(
+            _SELECT_TICKS,
+            {"symbol_id": symbol_id, "start": start, "end": end, "limit": limit},
+            execution_options={"yield_per": _STREAM_CHUNK_ROWS}
+        )
+        chunks = []
+        async for rows in result.partitions():
+            chunks.append(_encode([TickRow(time, symbol, price) for time, price in rows])[1:-1])
+        return Response(content=b"[" + b",".join(chunks) + b"]", media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch ticks: {str(e)}")
@@ -213,31 +329,27 @@ async def update_tick(
     ```
     """
     try:
-        # Find the tick
-        query = select(Tick).where(
-            and_(
-                Tick.time == time,
-                Tick.symbol == symbol
+        # Single UPDATE ... RETURNING; no row back means the tick doesn't exist
+        symbol_id = await symbol_registry.get_id(symbol)
+        row = None
+        if symbol_id is not None:
+            result = await db.execute(
+                _UPDATE_PRICE,
+                {"tick_time": time, "tick_symbol_id": symbol_id, "new_price": tick_update.price}
             )
-        )
-        result = await db.execute(query)
-        tick = result.scalar_one_or_none()
+            row = result.first()
         
-        if not tick:
+        if row is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Tick not found for symbol={symbol} at time={time}"
             )
         
-        # Update price
-        tick.price = tick_update.price
         await db.commit()
-        await db.refresh(tick)
         
-        return TickResponse(
-            time=tick.time,
-            symbol=tick.symbol,
-            price=tick.price
+        return Response(
+            content=_encode(TickRow(row.time, symbol, row.price)),
+            media_type="application/json"
         )
         
     except HTTPException:
@@ -249,9 +361,10 @@ async def update_tick(
 
 @router.delete("/", response_model=dict)
 async def delete_ticks(
-    symbol: str = Query(..., description="Currency pair symbol"),
+    symbol: Optional[str] = Query(None, description="Currency pair symbol (omit with chunk_aligned)"),
     start: datetime = Query(..., description="Start time (ISO 8601, UTC)"),
     end: datetime = Query(..., description="End time (ISO 8601, UTC)"),
+    chunk_aligned: bool = Query(False, description="Drop whole day chunks for all symbols"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -276,18 +389,45 @@ async def delete_ticks(
         "message": "Deleted 3600 ticks for EURUSD between 2025-12-05T10:00:00Z and 2025-12-05T11:00:00Z"
     }
     ```
+    
+    **Chunk-aligned cleanup:** with `chunk_aligned=true` (and no `symbol`),
+    `start` and `end` must fall on UTC midnight. The whole 1-day chunks in
+    between are dropped with `drop_chunks` for every symbol, which only
+    touches catalog metadata instead of rewriting rows. The response reports
+    `dropped_chunks` rather than a row count, and existing OHLC buckets for
+    the range are kept until the aggregates are refreshed over it.
     """
+    if chunk_aligned:
+        if symbol is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="chunk_aligned drops ticks for every symbol; omit the symbol filter"
+            )
+        if any(t.tzinfo is None or t.astimezone(timezone.utc).time() != datetime.min.time()
+               for t in (start, end)):
+            raise HTTPException(
+                status_code=400,
+                detail="chunk_aligned requires start and end at UTC midnight"
+            )
+    elif symbol is None:
+        raise HTTPException(status_code=422, detail="symbol is required unless chunk_aligned=true")
+    
     try:
+        if chunk_aligned:
+            result = await db.execute(_DROP_CHUNKS, {"start": start, "end": end})
+            dropped = len(result.fetchall())
+            await db.commit()
+            return {
+                "dropped_chunks": dropped,
+                "message": f"Dropped {dropped} chunks between {start} and {end}"
+            }
+        
         # Delete ticks in range
-        delete_query = delete(Tick).where(
-            and_(
-                Tick.symbol == symbol,
-                Tick.time >= start,
-                Tick.time < end
-            )
+        symbol_id = await symbol_registry.get_id(symbol)
+        result = await db.execute(
+            _DELETE_RANGE,
+            {"symbol_id": symbol_id, "start": start, "end": end}
         )
-        
-        result = await db.execute(delete_query)
         await db.commit()
         
         deleted_count = result.rowcount
@@ -321,14 +461,8 @@ async def delete_single_tick(
     ```
     """
     try:
-        delete_query = delete(Tick).where(
-            and_(
-                Tick.symbol == symbol,
-                Tick.time == time
-            )
-        )
-        
-        result = await db.execute(delete_query)
+        symbol_id = await symbol_registry.get_id(symbol)
+        result = await db.execute(_DELETE_ONE, {"symbol_id": symbol_id, "tick_time": time})
         await db.commit()
         
         if result.rowcount == 0:
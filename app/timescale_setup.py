@@ -7,6 +7,7 @@ and sets up continuous aggregates with refresh policies for real-time OHLC calcu
 import logging
 from sqlalchemy import text
 from app.database import engine
+from app.models import PRICE_SCALE
 
 logger = logging.getLogger(__name__)
 
@@ -53,57 +54,63 @@ async def setup_timescaledb():
                 logger.warning("Table eurusd_ticks does not exist yet, skipping hypertable creation")
                 return  # Exit early if table doesn't exist
             
+            # OHLC columns shared by the continuous aggregates. With the Toolkit,
+            # one candlestick_agg pass replaces first/max/min/last (Postgres
+            # evaluates the identical aggregate call once per bucket)
+            if await _enable_toolkit(conn):
+                candle = "candlestick_agg(time, price::FLOAT8, 1)"
+                ohlc_columns = (
+                    f"open({candle}) AS open, high({candle}) AS high, "
+                    f"low({candle}) AS low, close({candle}) AS close, "
+                    "count(*) AS tick_count"
+                )
+            else:
+                ohlc_columns = (
+                    "first(price, time) AS open, max(price) AS high, "
+                    "min(price) AS low, last(price, time) AS close, "
+                    "count(*) AS tick_count"
+                )
+            
             # 3. Create continuous aggregate for minute OHLC with REAL-TIME aggregation
+            # (open/high/low/close stay in integer price units; readers divide by PRICE_SCALE)
             logger.info("Creating continuous aggregate for minute OHLC...")
-            await conn.execute(text("""
+            await conn.execute(text(f"""
                 CREATE MATERIALIZED VIEW IF NOT EXISTS eurusd_ohlc_minute
                 WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
                 SELECT
                     time_bucket('1 minute', time) AS bucket,
-                    symbol,
-                    first(price, time) AS open,
-                    max(price) AS high,
-                    min(price) AS low,
-                    last(price, time) AS close,
-                    count(*) AS tick_count
+                    symbol_id,
+                    {ohlc_columns}
                 FROM eurusd_ticks
-                GROUP BY bucket, symbol
+                GROUP BY bucket, symbol_id
                 WITH NO DATA;
             """))
             
             # 4. Create continuous aggregate for hourly OHLC with REAL-TIME aggregation
             logger.info("Creating continuous aggregate for hourly OHLC...")
-            await conn.execute(text("""
+            await conn.execute(text(f"""
                 CREATE MATERIALIZED VIEW IF NOT EXISTS eurusd_ohlc_hour
                 WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
                 SELECT
                     time_bucket('1 hour', time) AS bucket,
-                    symbol,
-                    first(price, time) AS open,
-                    max(price) AS high,
-                    min(price) AS low,
-                    last(price, time) AS close,
-                    count(*) AS tick_count
+                    symbol_id,
+                    {ohlc_columns}
                 FROM eurusd_ticks
-                GROUP BY bucket, symbol
+                GROUP BY bucket, symbol_id
                 WITH NO DATA;
             """))
             
             # 5. Create continuous aggregate for daily OHLC with REAL-TIME aggregation
             logger.info("Creating continuous aggregate for daily OHLC...")
-            await conn.execute(text("""
+            await conn.execute(text(f"""
                 CREATE MATERIALIZED VIEW IF NOT EXISTS eurusd_ohlc_day
                 WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
                 SELECT
                     time_bucket('1 day', time) AS bucket,
-                    symbol,
-                    first(price, time) AS open,
-                    max(price) AS high,
-                    min(price) AS low,
-                    last(price, time) AS close,
-                    count(*) AS tick_count
+                    symbol_id,
+                    {ohlc_columns}
                 FROM eurusd_ticks
-                GROUP BY bucket, symbol
+                GROUP BY bucket, symbol_id
                 WITH NO DATA;
             """))
             
@@ -144,15 +151,15 @@ async def setup_timescaledb():
             logger.info("Creating indexes on continuous aggregates...")
             await conn.execute(text("""
                 CREATE INDEX IF NOT EXISTS idx_minute_bucket 
-                ON eurusd_ohlc_minute (bucket DESC, symbol);
+                ON eurusd_ohlc_minute (bucket DESC, symbol_id);
             """))
             await conn.execute(text("""
                 CREATE INDEX IF NOT EXISTS idx_hour_bucket 
-                ON eurusd_ohlc_hour (bucket DESC, symbol);
+                ON eurusd_ohlc_hour (bucket DESC, symbol_id);
             """))
             await conn.execute(text("""
                 CREATE INDEX IF NOT EXISTS idx_day_bucket 
-                ON eurusd_ohlc_day (bucket DESC, symbol);
+                ON eurusd_ohlc_day (bucket DESC, symbol_id);
             """))
             
             # 8. Set up compression policy (optional, for production efficiency)
@@ -160,7 +167,7 @@ async def setup_timescaledb():
             await conn.execute(text("""
                 ALTER TABLE eurusd_ticks SET (
                     timescaledb.compress,
-                    timescaledb.compress_segmentby = 'symbol',
+                    timescaledb.compress_segmentby = 'symbol_id',
                     timescaledb.compress_orderby = 'time DESC'
                 );
             """))
@@ -181,6 +188,23 @@ async def setup_timescaledb():
                 );
             """))
             
+            # 10. Notify WebSocket OHLC streamers when ticks arrive
+            # (statement-level: one NOTIFY per insert batch, not per row)
+            logger.info("Creating tick insert notification trigger...")
+            await conn.execute(text("""
+                CREATE OR REPLACE FUNCTION notify_ohlc_updated() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify('ohlc_updated', '');
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """))
+            await conn.execute(text("""
+                CREATE OR REPLACE TRIGGER eurusd_ticks_notify_ohlc
+                AFTER INSERT OR UPDATE OR DELETE ON eurusd_ticks
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_ohlc_updated();
+            """))
+            
             logger.info("TimescaleDB setup completed successfully!")
             
         except Exception as e:
@@ -188,6 +212,18 @@ async def setup_timescaledb():
             raise
 
 
+async def _enable_toolkit(conn) -> bool:
+    """Enable timescaledb_toolkit if the server ships it; return whether it is available."""
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'timescaledb_toolkit'"
+    ))
+    if result.scalar() is None:
+        logger.info("timescaledb_toolkit not available, using first/last aggregates")
+        return False
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS timescaledb_toolkit;"))
+    return True
+
+
 async def setup_custom_day_aggregate():
     """
     Create a custom function for daily OHLC with offset (e.g., day starts at 10 PM).
@@ -195,7 +231,7 @@ async def setup_custom_day_aggregate():
     async with engine.begin() as conn:
         try:
             logger.info("Creating custom day OHLC function...")
-            await conn.execute(text("""
+            await conn.execute(text(f"""
                 CREATE OR REPLACE FUNCTION get_custom_day_ohlc(
                     start_time TIMESTAMPTZ,
                     end_time TIMESTAMPTZ,
@@ -220,17 +256,18 @@ async def setup_custom_day_aggregate():
                     
                     RETURN QUERY
                     SELECT
-                        time_bucket('1 day', time, origin_point) AS bucket,
-                        t.symbol,
-                        first(t.price, t.time) AS open,
-                        max(t.price) AS high,
-                        min(t.price) AS low,
-                        last(t.price, t.time) AS close,
+                        time_bucket('1 day', t.time, origin_point) AS bucket,
+                        s.code AS symbol,
+                        first(t.price, t.time)::FLOAT8 / {PRICE_SCALE} AS open,
+                        max(t.price)::FLOAT8 / {PRICE_SCALE} AS high,
+                        min(t.price)::FLOAT8 / {PRICE_SCALE} AS low,
+                        last(t.price, t.time)::FLOAT8 / {PRICE_SCALE} AS close,
                         count(*)::BIGINT AS tick_count
                     FROM eurusd_ticks t
+                    JOIN symbols s ON s.id = t.symbol_id
                     WHERE t.time >= start_time AND t.time < end_time
-                    GROUP BY bucket, t.symbol
-                    ORDER BY bucket ASC;
+                    GROUP BY 1, s.code
+                    ORDER BY 1 ASC;
                 END;
                 $$ LANGUAGE plpgsql;
             """))
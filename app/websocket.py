@@ -1,167 +1,302 @@
 """
 WebSocket endpoints for real-time tick and OHLC streaming.
 
-Manages WebSocket connections and broadcasts live data updates from Redis
-to connected clients for real-time dashboards and monitoring.
+Manages WebSocket connections and broadcasts live data updates from the Redis
+tick stream to connected clients for real-time dashboards and monitoring.
 """
 import asyncio
-import json
 import logging
-from typing import Dict, Set
+import asyncpg
+import msgspec
+import orjson
+from typing import Dict, List, Set, Tuple
 from datetime import datetime, timezone
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from redis import asyncio as aioredis
 from app.config import settings
-from app. database import AsyncSessionLocal
-from app.schemas import ConnectionStatsResponse
-from sqlalchemy import text
+from app.models import PRICE_SCALE
+from app.schemas import ConnectionStatsResponse, OHLCFrame
 
 logger = logging. getLogger(__name__)
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
+_encode = msgspec.json.Encoder().encode
+# JSON frame -> MessagePack for clients that negotiate the "msgpack" subprotocol
+_decode_json = msgspec.json.Decoder().decode
+_encode_msgpack = msgspec.msgpack.Encoder().encode
+
+
+# Latest bucket per OHLC interval, fused into a single statement
+_LATEST_OHLC_SQL = " UNION ALL ".join(
+    f"""(
+        SELECT '{interval}' AS interval, a.bucket, s.code AS symbol,
+               a.open::float8 / {PRICE_SCALE}, a.high::float8 / {PRICE_SCALE},
+               a.low::float8 / {PRICE_SCALE}, a.close::float8 / {PRICE_SCALE},
+               a.tick_count
+        FROM eurusd_ohlc_{interval} a
+        JOIN symbols s ON s.id = a.symbol_id
+        ORDER BY a.bucket DESC
+        LIMIT 1
+    )"""
+    for interval in ("minute", "hour", "day")
+)
 
 class ConnectionManager:
     """Manages WebSocket connections for broadcasting."""
     
     def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {
-            "ticks": set(),
-            "ohlc_minute": set(),
-            "ohlc_hour": set(),
-            "ohlc_day": set(),
+        # Copy-on-write tuples: connect/disconnect swap in a new tuple, so a
+        # broadcast iterates a stable snapshot without locking or copying
+        self.active_connections: Dict[str, Tuple[WebSocket, ...]] = {
+            "ticks": (),
+            "ohlc_minute": (),
+            "ohlc_hour": (),
+            "ohlc_day": (),
         }
         self.redis_client = None
-        self.pubsub = None
+        # Dedicated asyncpg connection for the OHLC streamer (LISTEN + queries)
+        self._stream_conn = None
+        # channel -> (row values, encoded frame) of the last OHLC push
+        self._last_ohlc: Dict[str, Tuple[tuple, str]] = {}
+        # Clients that negotiated the "msgpack" subprotocol get binary frames
+        self._binary_clients: Set[WebSocket] = set()
+        # Tick frames waiting for the flusher; events exist while it runs
+        self._tick_batch: List[str] = []
+        self._ticks_pending = None
+        self._ticks_full = None
     
     async def connect(self, websocket: WebSocket, channel: str):
-        """Accept and register WebSocket connection."""
-        await websocket.accept()
+        """
+        Accept and register WebSocket connection.
+        
+        Clients offering the "msgpack" subprotocol receive MessagePack
+        binary frames; everyone else gets JSON text frames.
+        """
+        binary = "msgpack" in websocket.scope.get("subprotocols", ())
+        await websocket.accept(subprotocol="msgpack" if binary else None)
+        if binary:
+            self._binary_clients.add(websocket)
+        # OHLC frames are only pushed on change; start new clients off with the last one
+        last = self._last_ohlc.get(channel)
+        if last is not None:
+            if binary:
+                await websocket.send_bytes(_encode_msgpack(_decode_json(last[1])))
+            else:
+                await websocket.send_text(last[1])
         if channel in self.active_connections:
-            self.active_connections[channel]. add(websocket)
+            self.active_connections[channel] += (websocket,)
             logger.info(f"Client connected to {channel}.  Total: {len(self.active_connections[channel])}")
     
     def disconnect(self, websocket: WebSocket, channel: str):
         """Remove WebSocket connection."""
         if channel in self.active_connections:
-            self.active_connections[channel].discard(websocket)
+            self._remove(websocket, channel)
             logger.info(f"Client disconnected from {channel}.  Total: {len(self.active_connections[channel])}")
     
+    def _remove(self, websocket: WebSocket, channel: str):
+        """Drop a connection from a channel by swapping in a new tuple."""
+        self._binary_clients.discard(websocket)
+        self.active_connections[channel] = tuple(
+            connection for connection in self.active_connections[channel]
+            if connection is not websocket
+        )
+    
     async def broadcast(self, message: dict, channel: str):
         """Broadcast message to all connected clients on a channel."""
-        if channel not in self.active_connections:
+        if self.active_connections.get(channel):
+            await self.broadcast_text(orjson.dumps(message).decode(), channel)
+    
+    async def broadcast_text(self, payload: str, channel: str):
+        """
+        Send an already-encoded JSON frame to all clients on a channel.
+        
+        Every client gets the same string, sent concurrently so one slow
+        socket doesn't delay the rest. The MessagePack form is built once
+        per broadcast, and only when binary clients are connected.
+        """
+        connections = self.active_connections.get(channel, ())
+        if not connections:
             return
         
-        disconnected = set()
-        for connection in self.active_connections[channel]:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending to client: {e}")
-                disconnected.add(connection)
+        binary_clients = self._binary_clients
+        if binary_clients:
+            packed = _encode_msgpack(_decode_json(payload))
+            sends = (
+                connection.send_bytes(packed) if connection in binary_clients
+                else connection.send_text(payload)
+                for connection in connections
+            )
+        else:
+            sends = (connection.send_text(payload) for connection in connections)
+        
+        results = await asyncio.gather(*sends, return_exceptions=True)
         
         # Clean up disconnected clients
-        for conn in disconnected:
-            self.active_connections[channel].discard(conn)
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error("Error sending to client: %s", result)
+                self._remove(connection, channel)
     
-    async def start_redis_listener(self):
-        """Listen to Redis pub/sub and broadcast to WebSocket clients."""
+    async def send_tick(self, payload: str):
+        """
+        Queue an encoded tick for the /ws/ticks batch.
+        
+        While the flusher runs, ticks are sent as JSON arrays; otherwise
+        (or with WS_TICK_BATCH_MS=0) each tick goes out as its own frame.
+        """
+        if self._ticks_pending is None:
+            await self.broadcast_text(payload, "ticks")
+            return
+        self._tick_batch.append(payload)
+        self._ticks_pending.set()
+        if len(self._tick_batch) >= settings.WS_TICK_BATCH_MAX:
+            self._ticks_full.set()
+    
+    async def start_tick_flusher(self):
+        """
+        Send queued ticks to /ws/ticks clients as one JSON array per batch.
+        
+        A batch is flushed WS_TICK_BATCH_MS after its first tick, or as soon
+        as it reaches WS_TICK_BATCH_MAX, so at high tick rates each client
+        gets one frame (and one write) per batch instead of one per tick.
+        """
+        if settings.WS_TICK_BATCH_MS <= 0:
+            return
+        
+        self._ticks_pending = asyncio.Event()
+        self._ticks_full = asyncio.Event()
+        window = settings.WS_TICK_BATCH_MS / 1000
+        logger.info("WebSocket tick flusher started")
+        
         try:
-            self.redis_client = await aioredis.from_url(
-                settings.redis_url_with_auth,
-                decode_responses=True,
-                encoding="utf-8"
-            )
-            self.pubsub = self.redis_client.pubsub()
-            await self.pubsub.subscribe(settings.TICK_CHANNEL)
+            while True:
+                await self._ticks_pending.wait()
+                try:
+                    await asyncio.wait_for(self._ticks_full.wait(), window)
+                except asyncio.TimeoutError:
+                    pass
+                self._ticks_pending.clear()
+                self._ticks_full.clear()
+                
+                batch, self._tick_batch = self._tick_batch, []
+                try:
+                    await self.broadcast_text(f"[{','.join(batch)}]", "ticks")
+                except Exception as e:
+                    logger.error("Error flushing tick batch: %s", e)
+        finally:
+            self._ticks_pending = None
+            self._ticks_full = None
+            self._tick_batch = []
+    
+    async def start_redis_listener(self, pool: aioredis.ConnectionPool):
+        """
+        Tail the Redis tick stream and broadcast to WebSocket clients.
+        
+        Uses plain XREAD rather than the consumer group so every worker sees
+        every tick, starting from the newest entry at startup.
+        """
+        try:
+            self.redis_client = aioredis.Redis(connection_pool=pool)
+            
+            # Resume after the current tail; "0-0" if the stream is still empty
+            latest = await self.redis_client.xrevrange(settings.TICK_STREAM, count=1)
+            last_id = latest[0][0] if latest else "0-0"
             
             logger.info("WebSocket Redis listener started")
             
-            async for message in self.pubsub.listen():
-                if message["type"] == "message":
-                    try:
-                        tick_data = json.loads(message["data"])
-                        # Broadcast to tick subscribers
-                        await self.broadcast(tick_data, "ticks")
-                    except Exception as e:
-                        logger. error(f"Error broadcasting tick: {e}")
+            while True:
+                response = await self.redis_client.xread(
+                    {settings.TICK_STREAM: last_id},
+                    count=100,
+                    block=1000
+                )
+                for _stream, messages in response:
+                    for message_id, fields in messages:
+                        last_id = message_id
+                        if not self.active_connections["ticks"]:
+                            continue
+                        try:
+                            # The stream entry is already the JSON frame clients
+                            # expect; forward it as text without re-encoding
+                            await self.send_tick(fields[b"data"].decode())
+                        except Exception as e:
+                            logger.error("Error broadcasting tick: %s", e)
         except Exception as e:
             logger.error(f"Redis listener error: {e}")
     
     async def start_ohlc_streamer(self):
-        """Stream OHLC updates periodically."""
-        logger.info("OHLC streamer started")
+        """
+        Push the latest OHLC rows whenever ticks change.
         
-        while True:
-            try:
-                # Fetch latest minute OHLC
-                minute_data = await self._fetch_latest_ohlc("minute", 1)
-                if minute_data:
-                    await self.broadcast(minute_data, "ohlc_minute")
-                
-                # Fetch latest hourly OHLC
-                hour_data = await self._fetch_latest_ohlc("hour", 1)
-                if hour_data:
-                    await self. broadcast(hour_data, "ohlc_hour")
-                
-                # Fetch latest daily OHLC
-                day_data = await self._fetch_latest_ohlc("day", 1)
-                if day_data:
-                    await self. broadcast(day_data, "ohlc_day")
-                
-                await asyncio.sleep(5)  # Update every 5 seconds
-                
-            except Exception as e:
-                logger.error(f"Error in OHLC streamer: {e}")
-                await asyncio.sleep(5)
-    
-    async def _fetch_latest_ohlc(self, interval: str, limit: int = 1) -> dict:
-        """Fetch latest OHLC data from database."""
-        table_map = {
-            "minute": "eurusd_ohlc_minute",
-            "hour": "eurusd_ohlc_hour",
-            "day": "eurusd_ohlc_day"
-        }
+        Waits on Postgres NOTIFY ohlc_updated (sent by a statement-level
+        trigger on eurusd_ticks) instead of polling, and pushes at most once
+        per OHLC_STREAM_MIN_INTERVAL. Listening and querying share one
+        long-lived connection outside the SQLAlchemy pool, so the streamer
+        neither churns sessions nor competes with API handlers.
+        """
+        logger.info("OHLC streamer started")
         
-        table = table_map.get(interval)
-        if not table:
-            return None
+        updated = asyncio.Event()
         
-        async with AsyncSessionLocal() as session:
-            try:
-                stmt = text(f"""
-                    SELECT bucket, symbol, open, high, low, close, tick_count
-                    FROM {table}
-                    ORDER BY bucket DESC
-                    LIMIT :limit
-                """)
-                
-                result = await session.execute(stmt, {"limit": limit})
-                row = result.fetchone()
-                
-                if row:
-                    return {
-                        "interval": interval,
-                        "bucket": row[0]. isoformat(),
-                        "symbol": row[1],
-                        "open": row[2],
-                        "high": row[3],
-                        "low": row[4],
-                        "close": row[5],
-                        "tick_count": row[6],
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    }
-            except Exception as e:
-                logger.error(f"Error fetching latest OHLC: {e}")
-        
-        return None
+        try:
+            while True:
+                try:
+                    if self._stream_conn is None or self._stream_conn.is_closed():
+                        self._stream_conn = await self._connect_streamer(updated)
+                        updated.set()  # Push the current rows right away
+                    
+                    await updated.wait()
+                    updated.clear()
+                    
+                    # Latest bucket of every interval in one round-trip; push
+                    # only the ones that changed (e.g. not on another symbol's tick)
+                    for frame in await self._fetch_latest_ohlc():
+                        channel = f"ohlc_{frame.interval}"
+                        values = (frame.bucket, frame.symbol, frame.open, frame.high,
+                                  frame.low, frame.close, frame.tick_count)
+                        last = self._last_ohlc.get(channel)
+                        if last is not None and last[0] == values:
+                            continue
+                        payload = _encode(frame).decode()
+                        self._last_ohlc[channel] = (values, payload)
+                        await self.broadcast_text(payload, channel)
+                    
+                    await asyncio.sleep(settings.OHLC_STREAM_MIN_INTERVAL)
+                    
+                except Exception as e:
+                    logger.error(f"Error in OHLC streamer: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            await self._close_stream_conn()
+    
+    async def _connect_streamer(self, updated: asyncio.Event):
+        """Open the streamer connection and LISTEN on ohlc_updated."""
+        conn = await asyncpg.connect(
+            settings.database_url_sync,
+            server_settings={"jit": "off"}
+        )
+        await conn.add_listener("ohlc_updated", lambda *_args: updated.set())
+        # Wake the loop so a dropped connection is noticed and reopened
+        conn.add_termination_listener(lambda _conn: updated.set())
+        return conn
+    
+    async def _close_stream_conn(self):
+        """Close the streamer connection if it is open."""
+        if self._stream_conn is not None and not self._stream_conn.is_closed():
+            await self._stream_conn.close()
+        self._stream_conn = None
+    
+    async def _fetch_latest_ohlc(self) -> list:
+        """Fetch the latest minute, hour and day OHLC rows on the streamer connection."""
+        rows = await self._stream_conn.fetch(_LATEST_OHLC_SQL)
+        timestamp = datetime.now(timezone.utc)
+        return [OHLCFrame(*row, timestamp) for row in rows]
     
     async def shutdown(self):
         """Cleanup on shutdown."""
-        if self.pubsub:
-            await self. pubsub.unsubscribe(settings.TICK_CHANNEL)
-            await self.pubsub.close()
         if self.redis_client:
             await self.redis_client.close()
+        await self._close_stream_conn()
         logger.info("WebSocket manager shut down")
 
 
@@ -174,12 +309,15 @@ async def websocket_ticks(websocket: WebSocket):
     """
     WebSocket endpoint for real-time tick data.
     
-    Client receives JSON messages:
-    {
-        "time": "2025-12-03T12:34:56. 789Z",
-        "symbol": "EURUSD",
-        "price": 1.10045
-    }
+    Client receives JSON arrays of ticks, one array per batch
+    (a single object per message when WS_TICK_BATCH_MS=0):
+    [
+        {
+            "time": "2025-12-03T12:34:56. 789Z",
+            "symbol": "EURUSD",
+            "price": 1.10045
+        }
+    ]
     """
     await manager.connect(websocket, "ticks")
     try:
@@ -197,7 +335,7 @@ async def websocket_ticks(websocket: WebSocket):
 async def websocket_ohlc_minute(websocket: WebSocket):
     """
     WebSocket endpoint for real-time minute OHLC data.
-    Updates every 5 seconds with latest minute bar. 
+    Pushes the latest minute bar as new ticks arrive.
     """
     await manager. connect(websocket, "ohlc_minute")
     try:
@@ -214,7 +352,7 @@ async def websocket_ohlc_minute(websocket: WebSocket):
 async def websocket_ohlc_hour(websocket: WebSocket):
     """
     WebSocket endpoint for real-time hourly OHLC data. 
-    Updates every 5 seconds with latest hour bar. 
+    Pushes the latest hour bar as new ticks arrive.
     """
     await manager.connect(websocket, "ohlc_hour")
     try:
@@ -231,7 +369,7 @@ async def websocket_ohlc_hour(websocket: WebSocket):
 async def websocket_ohlc_day(websocket: WebSocket):
     """
     WebSocket endpoint for real-time daily OHLC data. 
-    Updates every 5 seconds with latest day bar.
+    Pushes the latest day bar as new ticks arrive.
     """
     await manager.connect(websocket, "ohlc_day")
     try:
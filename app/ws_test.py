@@ -1,495 +1,124 @@
 """Static HTML page for WebSocket testing."""
-from fastapi import APIRouter
+import gzip
+import hashlib
+import re
+from pathlib import Path
+from typing import NamedTuple
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse
 
 router = APIRouter(tags=["WebSocket Testing"])
 
 
+_TEMPLATES = Path(__file__).parent / "templates"
+
+
+class _Variant(NamedTuple):
+    """One encoding of an asset: its ETag and prebuilt 200/304 responses."""
+    etag: str
+    response: Response
+    not_modified: Response
+
+
+class _Asset(NamedTuple):
+    """An immutable asset, prepared once in plain and gzip form."""
+    plain: _Variant
+    gzip: _Variant
+
+
+def _etag(body: bytes) -> str:
+    """Strong ETag for an immutable response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _variant(body: bytes, media_type: str, headers: dict) -> _Variant:
+    """Build the 200 and 304 responses for one encoding of an asset."""
+    etag = _etag(body)
+    headers = {**headers, "ETag": etag}
+    # 304s describe the representation but carry no body, hence no Content-Encoding
+    not_modified_headers = {k: v for k, v in headers.items() if k != "Content-Encoding"}
+    return _Variant(
+        etag,
+        Response(content=body, media_type=media_type, headers=headers),
+        Response(status_code=304, headers=not_modified_headers)
+    )
+
+
+def _asset(body: bytes, media_type: str, cache_control: str) -> _Asset:
+    """
+    Compress, tag and wrap an asset in ready-made responses.
+    
+    Starlette copies response headers before middleware touches them, so
+    the same Response objects can be returned to every request.
+    """
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": cache_control}
+    return _Asset(
+        _variant(body, media_type, headers),
+        _variant(gzip.compress(body, compresslevel=9), media_type, {**headers, "Content-Encoding": "gzip"})
+    )
+
+
+def _serve(request: Request, asset: _Asset) -> Response:
+    """
+    Respond with an asset, gzip-compressed when the client accepts it.
+    
+    A matching If-None-Match gets a bodiless 304 Not Modified.
+    """
+    variant = asset.gzip if "gzip" in request.headers.get("accept-encoding", "") else asset.plain
+    if variant.etag in request.headers.get("if-none-match", ""):
+        return variant.not_modified
+    return variant.response
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and layout whitespace from a stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _minify_styles(html: str) -> str:
+    """Minify every inline <style> block of a page."""
+    return re.sub(
+        r"(<style>)(.*?)(</style>)",
+        lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3),
+        html,
+        flags=re.S
+    )
+
+
+# Page script: served under a content-hashed URL, so browsers may cache it for good
+_WS_TEST_JS_BYTES = (_TEMPLATES / "ws_test.js").read_bytes()
+_WS_TEST_JS_URL = f"/ws-test/app.{_etag(_WS_TEST_JS_BYTES)[1:17]}.js"
+_WS_TEST_JS = _asset(_WS_TEST_JS_BYTES, "text/javascript; charset=utf-8", "public, max-age=31536000, immutable")
+
+# Page markup: read, minified, pointed at the script, compressed and tagged once at import
+_WS_TEST_HTML = _asset(
+    _minify_styles((_TEMPLATES / "ws_test.html").read_text(encoding="utf-8"))
+    .replace("{ws_test_js}", _WS_TEST_JS_URL)
+    .encode("utf-8"),
+    "text/html; charset=utf-8",
+    "no-cache"
+)
+
+
 @router.get("/ws-test", response_class=HTMLResponse)
-async def websocket_test_page():
+async def websocket_test_page(request: Request):
     """
     Interactive WebSocket testing page.
     
     Access at: http://localhost:8000/ws-test
-    """
-    return """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>WebSocket Test - FX OHLC Microservice</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            overflow: hidden;
-        }
-        
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }
-        
-        .header h1 {
-            font-size: 28px;
-            margin-bottom: 10px;
-        }
-        
-        .header p {
-            opacity: 0.9;
-            font-size: 14px;
-        }
-        
-        .content {
-            padding: 30px;
-        }
-        
-        .endpoint-selector {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 15px;
-            margin-bottom: 30px;
-        }
-        
-        .endpoint-btn {
-            padding: 15px 20px;
-            border: 2px solid #667eea;
-            background: white;
-            color: #667eea;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 14px;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 10px;
-        }
-        
-        .endpoint-btn:hover {
-            background: #667eea;
-            color: white;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-        }
-        
-        .endpoint-btn.active {
-            background: #667eea;
-            color: white;
-        }
-        
-        .endpoint-btn .icon {
-            font-size: 18px;
-        }
-        
-        .controls {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 30px;
-            flex-wrap: wrap;
-        }
-        
-        .btn {
-            padding: 12px 24px;
-            border: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }
-        
-        .btn-connect {
-            background: #10b981;
-            color: white;
-        }
-        
-        .btn-connect:hover {
-            background: #059669;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(16, 185, 129, 0.4);
-        }
-        
-        .btn-disconnect {
-            background: #ef4444;
-            color: white;
-        }
-        
-        .btn-disconnect:hover {
-            background: #dc2626;
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(239, 68, 68, 0.4);
-        }
-        
-        .btn-clear {
-            background: #6b7280;
-            color: white;
-        }
-        
-        .btn-clear:hover {
-            background: #4b5563;
-        }
-        
-        .btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-            transform: none !important;
-        }
-        
-        .status {
-            padding: 12px 20px;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 600;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-        }
-        
-        .status.disconnected {
-            background: #fef2f2;
-            color: #dc2626;
-        }
-        
-        .status.connected {
-            background: #f0fdf4;
-            color: #10b981;
-        }
-        
-        .status .pulse {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: currentColor;
-            animation: pulse 2s infinite;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-        
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-            gap: 15px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: #f9fafb;
-            padding: 15px;
-            border-radius: 8px;
-            text-align: center;
-        }
-        
-        .stat-value {
-            font-size: 24px;
-            font-weight: 700;
-            color: #667eea;
-            margin-bottom: 5px;
-        }
-        
-        .stat-label {
-            font-size: 12px;
-            color: #6b7280;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }
-        
-        .messages {
-            background: #1f2937;
-            color: #f9fafb;
-            padding: 20px;
-            border-radius: 8px;
-            height: 400px;
-            overflow-y: auto;
-            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-            font-size: 13px;
-            line-height: 1.6;
-        }
-        
-        .messages::-webkit-scrollbar {
-            width: 8px;
-        }
-        
-        .messages::-webkit-scrollbar-track {
-            background: #374151;
-            border-radius: 4px;
-        }
-        
-        .messages::-webkit-scrollbar-thumb {
-            background: #667eea;
-            border-radius: 4px;
-        }
-        
-        .message {
-            margin-bottom: 12px;
-            padding: 8px 12px;
-            border-radius: 4px;
-            background: #374151;
-        }
-        
-        .message-time {
-            color: #9ca3af;
-            font-size: 11px;
-            margin-right: 8px;
-        }
-        
-        .message-type {
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 11px;
-            font-weight: 600;
-            margin-right: 8px;
-        }
-        
-        .message-type.info {
-            background: #3b82f6;
-            color: white;
-        }
-        
-        .message-type.success {
-            background: #10b981;
-            color: white;
-        }
-        
-        .message-type.error {
-            background: #ef4444;
-            color: white;
-        }
-        
-        .message-type.data {
-            background: #8b5cf6;
-            color: white;
-        }
-        
-        .message-content {
-            color: #f9fafb;
-        }
-        
-        .json {
-            color: #a78bfa;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🔌 WebSocket Test Console</h1>
-            <p>FX OHLC Microservice - Real-time Data Streaming</p>
-        </div>
-        
-        <div class="content">
-            <h3 style="margin-bottom: 15px; color: #374151;">Select WebSocket Endpoint:</h3>
-            <div class="endpoint-selector">
-                <button class="endpoint-btn active" onclick="selectEndpoint('ticks')">
-                    <span class="icon">📊</span>
-                    <span>Real-time Ticks</span>
-                </button>
-                <button class="endpoint-btn" onclick="selectEndpoint('ohlc/minute')">
-                    <span class="icon">⏱️</span>
-                    <span>Minute OHLC</span>
-                </button>
-                <button class="endpoint-btn" onclick="selectEndpoint('ohlc/hour')">
-                    <span class="icon">⏰</span>
-                    <span>Hourly OHLC</span>
-                </button>
-                <button class="endpoint-btn" onclick="selectEndpoint('ohlc/day')">
-                    <span class="icon">📅</span>
-                    <span>Daily OHLC</span>
-                </button>
-            </div>
-            
-            <div class="controls">
-                <button class="btn btn-connect" onclick="connect()" id="connectBtn">
-                    🔌 Connect
-                </button>
-                <button class="btn btn-disconnect" onclick="disconnect()" id="disconnectBtn" disabled>
-                    🔌 Disconnect
-                </button>
-                <button class="btn btn-clear" onclick="clearMessages()">
-                    🗑️ Clear
-                </button>
-                <div class="status disconnected" id="status">
-                    <span class="pulse"></span>
-                    <span>Disconnected</span>
-                </div>
-            </div>
-            
-            <div class="stats">
-                <div class="stat-card">
-                    <div class="stat-value" id="messageCount">0</div>
-                    <div class="stat-label">Messages</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value" id="avgPrice">-</div>
-                    <div class="stat-label">Avg Price</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value" id="minPrice">-</div>
-                    <div class="stat-label">Min Price</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-value" id="maxPrice">-</div>
-                    <div class="stat-label">Max Price</div>
-                </div>
-            </div>
-            
-            <h3 style="margin-bottom: 15px; color: #374151;">Messages:</h3>
-            <div class="messages" id="messages"></div>
-        </div>
-    </div>
     
-    <script>
-        let ws = null;
-        let selectedEndpoint = 'ticks';
-        let messageCount = 0;
-        let prices = [];
-        
-        function selectEndpoint(endpoint) {
-            selectedEndpoint = endpoint;
-            document.querySelectorAll('.endpoint-btn').forEach(btn => {
-                btn.classList.remove('active');
-            });
-            event.target.closest('.endpoint-btn').classList.add('active');
-            
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                disconnect();
-                addMessage('info', `Switched to ${endpoint} endpoint. Click Connect to reconnect.`);
-            }
-        }
-        
-        function connect() {
-            const wsUrl = `ws://${window.location.host}/ws/${selectedEndpoint}`;
-            addMessage('info', `Connecting to ${wsUrl}...`);
-            
-            ws = new WebSocket(wsUrl);
-            
-            ws.onopen = () => {
-                addMessage('success', 'Connected successfully!');
-                updateStatus(true);
-                document.getElementById('connectBtn').disabled = true;
-                document.getElementById('disconnectBtn').disabled = false;
-            };
-            
-            ws.onmessage = (event) => {
-                messageCount++;
-                const data = JSON.parse(event.data);
-                
-                // Track prices for statistics
-                if (data.price) {
-                    prices.push(data.price);
-                } else if (data.close) {
-                    prices.push(data.close);
-                }
-                
-                updateStats();
-                addMessage('data', JSON.stringify(data, null, 2));
-            };
-            
-            ws.onerror = (error) => {
-                addMessage('error', 'WebSocket error occurred');
-                console.error('WebSocket error:', error);
-            };
-            
-            ws.onclose = () => {
-                addMessage('info', '🔌 Disconnected');
-                updateStatus(false);
-                document.getElementById('connectBtn').disabled = false;
-                document.getElementById('disconnectBtn').disabled = true;
-            };
-        }
-        
-        function disconnect() {
-            if (ws) {
-                ws.close();
-                ws = null;
-            }
-        }
-        
-        function updateStatus(connected) {
-            const statusEl = document.getElementById('status');
-            if (connected) {
-                statusEl.className = 'status connected';
-                statusEl.innerHTML = '<span class="pulse"></span><span>Connected</span>';
-            } else {
-                statusEl.className = 'status disconnected';
-                statusEl.innerHTML = '<span class="pulse"></span><span>Disconnected</span>';
-            }
-        }
-        
-        function updateStats() {
-            document.getElementById('messageCount').textContent = messageCount;
-            
-            if (prices.length > 0) {
-                const avg = prices.reduce((a, b) => a + b) / prices.length;
-                const min = Math.min(...prices);
-                const max = Math.max(...prices);
-                
-                document.getElementById('avgPrice').textContent = avg.toFixed(5);
-                document.getElementById('minPrice').textContent = min.toFixed(5);
-                document.getElementById('maxPrice').textContent = max.toFixed(5);
-            }
-        }
-        
-        function addMessage(type, content) {
-            const messagesEl = document.getElementById('messages');
-            const messageEl = document.createElement('div');
-            messageEl.className = 'message';
-            
-            const time = new Date().toLocaleTimeString();
-            const isJson = content.startsWith('{') || content.startsWith('[');
-            
-            messageEl.innerHTML = `
-                <span class="message-time">[${time}]</span>
-                <span class="message-type ${type}">${type.toUpperCase()}</span>
-                <span class="message-content ${isJson ? 'json' : ''}">${content}</span>
-            `;
-            
-            messagesEl.appendChild(messageEl);
-            messagesEl.scrollTop = messagesEl.scrollHeight;
-        }
-        
-        function clearMessages() {
-            document.getElementById('messages').innerHTML = '';
-            messageCount = 0;
-            prices = [];
-            updateStats();
-            document.getElementById('avgPrice').textContent = '-';
-            document.getElementById('minPrice').textContent = '-';
-            document.getElementById('maxPrice').textContent = '-';
-        }
-        
-        // Auto-connect on page load
-        window.addEventListener('load', () => {
-            addMessage('info', 'WebSocket test console ready. Click Connect to start.');
-        });
-    </script>
-</body>
-</html>
+    Served gzip-compressed when the client accepts it. The page is
+    revalidated on every visit (a cheap 304 when unchanged) so it always
+    points at the current script.
     """
+    return _serve(request, _WS_TEST_HTML)
+
+
+@router.get(_WS_TEST_JS_URL, include_in_schema=False)
+async def websocket_test_script(request: Request):
+    """Script for the WebSocket testing page (immutable; its URL changes with its content)."""
+    return _serve(request, _WS_TEST_JS)
@@ -14,7 +14,7 @@ from app.config import settings
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
+    level=settings.LOG_LEVEL.upper(),  # Resolved by logging itself; unknown names raise ValueError
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
@@ -31,15 +31,21 @@ async def main():
         await init_db()
         logger.info("Database tables created successfully")
         
-        # Initialize TimescaleDB setup
-        logger.info("Setting up TimescaleDB hypertables and continuous aggregates...")
-        await setup_timescaledb()
-        logger.info("TimescaleDB setup completed successfully")
-        
-        # Initialize custom day aggregate function
-        logger.info("Setting up custom day OHLC function...")
-        await setup_custom_day_aggregate()
-        logger.info("Custom day OHLC function created successfully")
+        # TimescaleDB objects and the custom day function are independent
+        # DDL on separate connections, so run them concurrently
+        logger.info("Setting up TimescaleDB and the custom day OHLC function...")
+        steps = ("TimescaleDB setup", "Custom day OHLC function")
+        results = await asyncio.gather(
+            setup_timescaledb(),
+            setup_custom_day_aggregate(),
+            return_exceptions=True
+        )
+        failed = [(step, result) for step, result in zip(steps, results) if isinstance(result, Exception)]
+        for step, error in failed:
+            logger.error(f"{step} failed: {error!r}")
+        if failed:
+            raise failed[0][1]
+        logger.info("TimescaleDB setup and custom day OHLC function completed successfully")
         
         logger.info("Database initialization completed successfully!")
         
@@ -0,0 +1,14 @@
+-- Rebuild idx_symbol_time as a covering index (symbol_id, time) INCLUDE (price)
+-- so symbol + time range reads can use index-only scans.
+--
+-- New databases get this index from app.models; existing ones keep the old
+-- definition because create_all() never alters an existing index.
+--
+-- Usage: psql -d fx_ohlc -v ON_ERROR_STOP=1 -f scripts/migrate_covering_index.sql
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_symbol_time;
+CREATE INDEX idx_symbol_time ON eurusd_ticks (symbol_id, time) INCLUDE (price);
+
+COMMIT;
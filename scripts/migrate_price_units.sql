@@ -0,0 +1,26 @@
+-- Migrate eurusd_ticks.price from float8 to a 4-byte INTEGER holding
+-- price * 100000 (app.models.PRICE_SCALE).
+--
+-- The continuous aggregates read the column, so they are dropped here and
+-- recreated afterwards by running scripts/init_db.py (or starting the app
+-- with RUN_DDL_ON_STARTUP=true). That also recreates get_custom_day_ohlc,
+-- which now scales its results back to prices.
+--
+-- Usage: psql -d fx_ohlc -v ON_ERROR_STOP=1 -f scripts/migrate_price_units.sql
+
+BEGIN;
+
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_day CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_hour CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_minute CASCADE;
+
+-- Compressed chunks cannot be altered; decompress and turn compression off
+-- until setup_timescaledb() re-enables it.
+SELECT remove_compression_policy('eurusd_ticks', if_exists => true);
+SELECT decompress_chunk(c, true) FROM show_chunks('eurusd_ticks') c;
+ALTER TABLE eurusd_ticks SET (timescaledb.compress = false);
+
+ALTER TABLE eurusd_ticks
+    ALTER COLUMN price TYPE INTEGER USING round(price * 100000)::INTEGER;
+
+COMMIT;
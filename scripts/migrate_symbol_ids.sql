@@ -0,0 +1,44 @@
+-- Migrate an existing eurusd_ticks table from a VARCHAR symbol column to a
+-- SMALLINT symbol_id referencing the symbols lookup table.
+--
+-- The continuous aggregates group by the old column, so they are dropped
+-- here and recreated afterwards by running scripts/init_db.py (or starting
+-- the app with RUN_DDL_ON_STARTUP=true).
+--
+-- Usage: psql -d fx_ohlc -v ON_ERROR_STOP=1 -f scripts/migrate_symbol_ids.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS symbols (
+    id SMALLSERIAL PRIMARY KEY,
+    code VARCHAR(10) NOT NULL UNIQUE
+);
+
+INSERT INTO symbols (code)
+SELECT DISTINCT symbol FROM eurusd_ticks
+ON CONFLICT (code) DO NOTHING;
+
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_day CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_hour CASCADE;
+DROP MATERIALIZED VIEW IF EXISTS eurusd_ohlc_minute CASCADE;
+
+-- Compressed chunks cannot be altered; decompress and turn compression off
+-- until setup_timescaledb() re-enables it segmented by symbol_id.
+SELECT remove_compression_policy('eurusd_ticks', if_exists => true);
+SELECT decompress_chunk(c, true) FROM show_chunks('eurusd_ticks') c;
+ALTER TABLE eurusd_ticks SET (timescaledb.compress = false);
+
+ALTER TABLE eurusd_ticks ADD COLUMN symbol_id SMALLINT;
+UPDATE eurusd_ticks t SET symbol_id = s.id FROM symbols s WHERE s.code = t.symbol;
+ALTER TABLE eurusd_ticks ALTER COLUMN symbol_id SET NOT NULL;
+
+ALTER TABLE eurusd_ticks DROP CONSTRAINT IF EXISTS eurusd_ticks_pkey;
+DROP INDEX IF EXISTS idx_symbol_time;
+ALTER TABLE eurusd_ticks DROP COLUMN symbol;
+
+ALTER TABLE eurusd_ticks ADD PRIMARY KEY (time, symbol_id);
+ALTER TABLE eurusd_ticks
+    ADD CONSTRAINT eurusd_ticks_symbol_id_fkey FOREIGN KEY (symbol_id) REFERENCES symbols (id);
+CREATE INDEX idx_symbol_time ON eurusd_ticks (symbol_id, time);
+
+COMMIT;
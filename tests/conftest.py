@@ -1,28 +1,88 @@
 """Test configuration and fixtures for pytest."""
 
 import asyncio
+import os
+import time
+import asyncpg
+import numpy as np
+import orjson
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from datetime import datetime, timezone, timedelta
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.main import app
-from app.database import get_db
-from app.config import settings
+from app import config as app_config
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows; fall back to the default asyncio loop
+    uvloop = None
+
+# Under pytest-xdist each worker gets its own database, so tests running in
+# parallel never see (or delete) each other's ticks. The settings are swapped
+# before any module that builds an engine imports them.
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+if _XDIST_WORKER:
+    app_config.settings = app_config.Settings(
+        POSTGRES_DB=f"{app_config.settings.POSTGRES_DB}_{_XDIST_WORKER}"
+    )
+
+from app.main import app  # noqa: E402
+from app.database import engine, get_db, init_db  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.timescale_setup import setup_timescaledb, setup_custom_day_aggregate  # noqa: E402
 
 
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create event loop for async tests."""
-    loop = asyncio.new_event_loop()
+    """Create event loop for async tests (uvloop when installed)."""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
     yield loop
     loop.close()
 
 
-@pytest_asyncio.fixture
-async def async_client() -> AsyncGenerator[AsyncClient, None]:
-    """Create async HTTP client for testing."""
+@pytest_asyncio.fixture(scope="session")
+async def worker_database():
+    """Create and set up this xdist worker's database (no-op without xdist)."""
+    if not _XDIST_WORKER:
+        return
+    
+    conn = await asyncpg.connect(
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        host=settings.POSTGRES_HOST,
+        port=settings.POSTGRES_PORT,
+        database="postgres"
+    )
+    try:
+        await conn.execute(f'CREATE DATABASE "{settings.POSTGRES_DB}"')
+    except asyncpg.DuplicateDatabaseError:
+        pass  # Kept from an earlier run; the setup below is idempotent
+    finally:
+        await conn.close()
+    
+    await init_db()
+    await setup_timescaledb()
+    await setup_custom_day_aggregate()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def timescaledb(worker_database):
+    """Skip tests that call TimescaleDB functions when the extension isn't installed."""
+    async with engine.connect() as conn:
+        installed = (await conn.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+        )).scalar()
+    if not installed:
+        pytest.skip("TimescaleDB extension not installed")
+
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client(worker_database) -> AsyncGenerator[AsyncClient, None]:
+    """Create one async HTTP client shared by the whole test session."""
     async with AsyncClient(
         transport=ASGITransport(app=app),
         base_url="http://test"
@@ -30,53 +90,134 @@ async def async_client() -> AsyncGenerator[AsyncClient, None]:
         yield client
 
 
+@pytest_asyncio.fixture
+async def db_transaction(worker_database):
+    """
+    Roll back everything a test writes through get_db.
+    
+    The test runs inside one outer transaction on a single connection. Each
+    request gets its own session joined to it with a SAVEPOINT, so the app's
+    commits are visible to the test's later requests and discarded afterwards.
+    """
+    async with engine.connect() as conn:
+        await conn.begin()
+        # One asyncpg connection: concurrent requests take turns
+        lock = asyncio.Lock()
+        
+        async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+            async with lock:
+                async with AsyncSession(
+                    bind=conn,
+                    expire_on_commit=False,
+                    autoflush=False,
+                    join_transaction_mode="create_savepoint"
+                ) as session:
+                    yield session
+        
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            yield
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            await conn.rollback()
+
+
+# Read-only test data, computed once at import; fixtures hand out shallow copies
+_BASE_TIME = datetime.now(timezone.utc)
+_BASE_NS = time.monotonic_ns()
+_TICK = {
+    "symbol": "EURUSD",
+    "time": _BASE_TIME.isoformat(),
+    "price": 1.12345
+}
+# Starts after _TICK so the two samples never share a (time, symbol) key
+_BULK_TICKS = tuple(
+    {
+        "symbol": "EURUSD",
+        "time": (_BASE_TIME + timedelta(seconds=i + 1)).isoformat(),
+        "price": 1.12345 + (i * 0.00001)
+    }
+    for i in range(5)
+)
+_OHLC_TIME_RANGE = {
+    "start": (_BASE_TIME - timedelta(hours=1)).isoformat(),
+    "end": _BASE_TIME.isoformat(),
+    "symbol": "EURUSD"
+}
+_CUSTOM_DAY_PARAMS = {
+    "start": (_BASE_TIME - timedelta(days=7)).isoformat(),
+    "end": _BASE_TIME.isoformat(),
+    "day_start_hour": 22,
+    "symbol": "EURUSD"
+}
+
+
+# Fixed historical window for read-only queries, far from the wall-clock ticks
+# other tests create; 1000 ticks 100 ms apart
+_SEED_START = datetime(2024, 1, 2, tzinfo=timezone.utc)
+# ISO strings formatted in one vectorized numpy call instead of 1000 isoformat()s
+_SEED_TICKS = [
+    {"symbol": "EURUSD", "time": tick_time, "price": 1.10000 + (i % 100) * 0.00001}
+    for i, tick_time in enumerate(np.datetime_as_string(
+        np.datetime64(_SEED_START.replace(tzinfo=None), "us") + np.arange(1000) * np.timedelta64(100, "ms"),
+        timezone="UTC"
+    ).tolist())
+]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded_ticks(async_client: AsyncClient):
+    """Bulk-insert the seed window once per module (backfill keeps reruns idempotent)."""
+    response = await async_client.post(
+        "/ticks/bulk?mode=backfill",
+        content=orjson.dumps(_SEED_TICKS),
+        headers={"content-type": "application/json"}
+    )
+    assert response.status_code == 201
+    return {
+        "start": _SEED_START.isoformat(),
+        "end": (_SEED_START + timedelta(milliseconds=100 * len(_SEED_TICKS))).isoformat(),
+        "symbol": "EURUSD"
+    }
+
+
 @pytest.fixture
 def sample_tick_data():
     """Sample tick data for testing."""
-    return {
-        "symbol": "EURUSD",
-        "time": datetime.now(timezone.utc).isoformat(),
-        "price": 1.12345
-    }
+    return dict(_TICK)
 
 
 @pytest.fixture
 def sample_bulk_ticks():
     """Sample bulk tick data for testing."""
-    base_time = datetime.now(timezone.utc)
-    return [
-        {
-            "symbol": "EURUSD",
-            "time": (base_time + timedelta(seconds=i)).isoformat(),
-            "price": 1.12345 + (i * 0.00001)
-        }
-        for i in range(5)
-    ]
+    return [dict(tick) for tick in _BULK_TICKS]
+
+
+@pytest.fixture
+def moving_clock():
+    """Callable returning the current UTC time, advanced monotonically from _BASE_TIME."""
+    return lambda: _BASE_TIME + timedelta(microseconds=(time.monotonic_ns() - _BASE_NS) // 1000)
+
+
+@pytest.fixture
+def make_tick(moving_clock):
+    """Callable building a tick at a fresh moving_clock() time; returns (tick, time)."""
+    def _make_tick(symbol: str = "EURUSD", price: float = 1.12345) -> Tuple[dict, str]:
+        tick_time = moving_clock().isoformat()
+        return {"symbol": symbol, "time": tick_time, "price": price}, tick_time
+    return _make_tick
 
 
 @pytest.fixture
 def ohlc_time_range():
     """Standard time range for OHLC queries."""
-    end = datetime.now(timezone.utc)
-    start = end - timedelta(hours=1)
-    return {
-        "start": start.isoformat(),
-        "end": end.isoformat(),
-        "symbol": "EURUSD"
-    }
+    return dict(_OHLC_TIME_RANGE)
 
 
 @pytest.fixture
 def custom_day_params():
     """Parameters for custom day OHLC queries."""
-    end = datetime.now(timezone.utc)
-    start = end - timedelta(days=7)
-    return {
-        "start": start.isoformat(),
-        "end": end.isoformat(),
-        "day_start_hour": 22,
-        "symbol": "EURUSD"
-    }
+    return dict(_CUSTOM_DAY_PARAMS)
 
     """Sample OHLC data for tests."""
     return {
@@ -0,0 +1,63 @@
+"""
+Tests for Prometheus label cardinality limits.
+
+Ensures free-form symbols and rejection reasons cannot create
+an unbounded number of time series.
+"""
+
+import random
+import string
+
+from prometheus_client import REGISTRY, Counter, CollectorRegistry
+
+from app.metrics import (
+    ALLOWED_SYMBOLS,
+    ALLOWED_REJECT_REASONS,
+    RejectReason,
+    reject_tick,
+    safe_labels,
+)
+
+
+def _random_symbol(rng: random.Random) -> str:
+    """Build a random printable string of 0-20 characters."""
+    return "".join(rng.choice(string.printable) for _ in range(rng.randint(0, 20)))
+
+
+class TestLabelCardinality:
+    """Test safe_labels() keeps series counts bounded."""
+
+    def test_fuzzed_symbols_are_bounded(self):
+        """Random symbols collapse into the allow-list plus one "other" series."""
+        metric = Counter('fuzz_ticks', 'Fuzzed ticks', ['symbol'], registry=CollectorRegistry())
+        rng = random.Random(1234)
+
+        for _ in range(1000):
+            safe_labels(metric, symbol=_random_symbol(rng)).inc()
+        for symbol in ALLOWED_SYMBOLS:
+            safe_labels(metric, symbol=symbol).inc()
+
+        samples = [s for s in metric.collect()[0].samples if s.name.endswith("_total")]
+        assert len(samples) <= len(ALLOWED_SYMBOLS) + 1
+        assert {s.labels["symbol"] for s in samples} == set(ALLOWED_SYMBOLS) | {"other"}
+
+    def test_unknown_reason_is_collapsed(self):
+        """Reasons outside the enum are reported as "other"."""
+        metric = Counter('fuzz_rejects', 'Fuzzed rejects', ['symbol', 'reason'], registry=CollectorRegistry())
+        rng = random.Random(5678)
+
+        for _ in range(500):
+            safe_labels(metric, symbol="EURUSD", reason=_random_symbol(rng)).inc()
+
+        reasons = {s.labels["reason"] for s in metric.collect()[0].samples}
+        assert reasons <= ALLOWED_REJECT_REASONS | {"other"}
+
+    def test_reject_tick_uses_enum_values(self):
+        """reject_tick() labels by the enum value and a bounded symbol."""
+        reject_tick("NOT-A-PAIR", RejectReason.BAD_TIME)
+
+        value = REGISTRY.get_sample_value(
+            'invalid_ticks_rejected_total', {'symbol': 'other', 'reason': 'bad_time'}
+        )
+        assert value >= 1
+        assert {reason.value for reason in RejectReason} == ALLOWED_REJECT_REASONS
@@ -10,48 +10,131 @@ Tests all CRUD operations:
 - DELETE /ticks/{symbol}/{time} - Delete single tick
 """
 
+import asyncio
+import numpy as np
+import orjson
 import pytest
 from datetime import datetime, timezone, timedelta
+from urllib.parse import quote
 from httpx import AsyncClient
 
+from app.models import MAX_PRICE, MIN_PRICE, PRICE_SCALE
 
-@pytest.mark.asyncio
-class TestTickAPI:
-    """Test Tick API CRUD operations."""
 
-    async def test_create_single_tick(self, async_client: AsyncClient, sample_tick_data):
-        """Test POST /ticks/ - Create single tick."""
-        response = await async_client.post("/ticks/", json=sample_tick_data)
-        
-        assert response.status_code == 201
-        data = response.json()
-        
-        assert data["symbol"] == sample_tick_data["symbol"]
-        assert data["price"] == sample_tick_data["price"]
-        assert "time" in data
+@pytest.mark.asyncio
+class TestTickValidation:
+    """Requests the API rejects without writing anything (no rollback fixture needed)."""
 
-    async def test_create_tick_invalid_symbol(self, async_client: AsyncClient):
+    async def test_create_tick_invalid_symbol(self, async_client: AsyncClient, sample_tick_data):
         """Test POST /ticks/ with invalid symbol."""
         invalid_data = {
-            "symbol": "INVALID_SYMBOL_TOO_LONG",  # > 10 chars
-            "time": datetime.now(timezone.utc).isoformat(),
-            "price": 1.12345
+            **sample_tick_data,
+            "symbol": "INVALID_SYMBOL_TOO_LONG"  # > 10 chars
         }
         
         response = await async_client.post("/ticks/", json=invalid_data)
         assert response.status_code == 422  # Validation error
 
-    async def test_create_tick_invalid_price(self, async_client: AsyncClient):
+    async def test_create_tick_invalid_price(self, async_client: AsyncClient, sample_tick_data):
         """Test POST /ticks/ with invalid price."""
         invalid_data = {
-            "symbol": "EURUSD",
-            "time": datetime.now(timezone.utc).isoformat(),
+            **sample_tick_data,
             "price": -1.0  # Negative price
         }
         
         response = await async_client.post("/ticks/", json=invalid_data)
         assert response.status_code == 422  # Validation error
 
+    @pytest.mark.parametrize("price", [MIN_PRICE / 2, MAX_PRICE + 1 / PRICE_SCALE])
+    async def test_create_tick_price_out_of_range(self, async_client: AsyncClient, sample_tick_data, price):
+        """Test POST /ticks/ with a price that rounds to 0 or overflows the INTEGER column."""
+        response = await async_client.post("/ticks/", json={**sample_tick_data, "price": price})
+        assert response.status_code == 422  # Validation error, not a DB error
+
+    @pytest.mark.parametrize("price", [MIN_PRICE / 2, MAX_PRICE + 1 / PRICE_SCALE])
+    async def test_bulk_create_price_out_of_range(self, async_client: AsyncClient, sample_bulk_ticks, price):
+        """Test POST /ticks/bulk rejects the whole request when one price is unstorable."""
+        sample_bulk_ticks[-1]["price"] = price
+        response = await async_client.post("/ticks/bulk", json=sample_bulk_ticks)
+        assert response.status_code == 422
+
+    async def test_update_nonexistent_tick(self, async_client: AsyncClient):
+        """Test PUT /ticks/ for non-existent tick."""
+        old_time = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        update_data = {"price": 1.12345}
+        
+        response = await async_client.put(
+            "/ticks/",
+            params={"time": old_time.isoformat(), "symbol": "EURUSD"},
+            json=update_data
+        )
+        assert response.status_code == 404
+
+    async def test_delete_nonexistent_single_tick(self, async_client: AsyncClient):
+        """Test DELETE /ticks/{symbol}/{time} for non-existent tick."""
+        tick_time = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        
+        response = await async_client.delete(f"/ticks/EURUSD/{quote(tick_time.isoformat())}")
+        assert response.status_code == 404
+
+    async def test_delete_ticks_requires_symbol(self, async_client: AsyncClient):
+        """Test DELETE /ticks/ without symbol is only allowed with chunk_aligned."""
+        response = await async_client.delete("/ticks/", params={
+            "start": "2000-01-01T00:00:00Z",
+            "end": "2000-01-02T00:00:00Z"
+        })
+        assert response.status_code == 422
+
+    async def test_delete_ticks_chunk_aligned_with_symbol(self, async_client: AsyncClient):
+        """Test DELETE /ticks/?chunk_aligned=true rejects a symbol filter."""
+        response = await async_client.delete("/ticks/", params={
+            "start": "2000-01-01T00:00:00Z",
+            "end": "2000-01-02T00:00:00Z",
+            "symbol": "EURUSD",
+            "chunk_aligned": "true"
+        })
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("start, end", [
+        ("2000-01-01T12:00:00Z", "2000-01-02T00:00:00Z"),
+        ("2000-01-01T00:00:00Z", "2000-01-02T00:00:01Z"),
+        ("2000-01-01T00:00:00", "2000-01-02T00:00:00"),  # Naive: midnight in no known zone
+    ])
+    async def test_delete_ticks_chunk_aligned_off_midnight(self, async_client: AsyncClient, start, end):
+        """Test DELETE /ticks/?chunk_aligned=true requires bounds at UTC midnight."""
+        response = await async_client.delete("/ticks/", params={
+            "start": start,
+            "end": end,
+            "chunk_aligned": "true"
+        })
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("db_transaction")
+class TestTickAPI:
+    """Test Tick API CRUD operations."""
+
+    async def test_create_single_tick(self, async_client: AsyncClient, sample_tick_data):
+        """Test POST /ticks/ - Create single tick."""
+        response = await async_client.post("/ticks/", json=sample_tick_data)
+        
+        assert response.status_code == 201
+        data = response.json()
+        
+        assert data["symbol"] == sample_tick_data["symbol"]
+        assert data["price"] == sample_tick_data["price"]
+        assert "time" in data
+
+    @pytest.mark.parametrize("price", [MIN_PRICE, MAX_PRICE])
+    async def test_create_tick_price_at_bounds(self, async_client: AsyncClient, make_tick, price):
+        """Test POST /ticks/ stores the smallest and largest representable prices."""
+        tick_data, _ = make_tick(price=price)
+        response = await async_client.post("/ticks/", json=tick_data)
+        
+        assert response.status_code == 201
+        assert response.json()["price"] == price
+
     async def test_bulk_create_ticks(self, async_client: AsyncClient, sample_bulk_ticks):
         """Test POST /ticks/bulk - Bulk create ticks."""
         response = await async_client.post("/ticks/bulk", json=sample_bulk_ticks)
@@ -72,265 +155,246 @@ class TestTickAPI:
         data = response.json()
         assert data["created"] == 0
 
-    async def test_get_ticks_by_time_range(self, async_client: AsyncClient):
+    async def test_get_ticks_by_time_range(self, async_client: AsyncClient, seeded_ticks):
         """Test GET /ticks/ - Retrieve ticks by time range."""
-        end = datetime.now(timezone.utc)
-        start = end - timedelta(hours=1)
-        
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
-        
-        response = await async_client.get(
-            f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD"
-        )
+        response = await async_client.get("/ticks/", params=seeded_ticks)
         
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
+        assert len(data) == 1000  # the whole seed window
 
-    async def test_get_ticks_with_limit(self, async_client: AsyncClient):
+    async def test_get_ticks_with_limit(self, async_client: AsyncClient, seeded_ticks):
         """Test GET /ticks/ with limit parameter."""
-        end = datetime.now(timezone.utc)
-        start = end - timedelta(hours=1)
+        response = await async_client.get("/ticks/", params={**seeded_ticks, "limit": 10})
         
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data, list)
+        assert len(data) == 10
+
+    async def test_get_ticks_cross_partition(self, async_client: AsyncClient):
+        """Test GET /ticks/ over a range spanning two 1-day hypertable chunks."""
+        midnight = datetime(2024, 1, 3, tzinfo=timezone.utc)
+        ticks = [
+            {
+                "symbol": "EURUSD",
+                "time": (midnight + timedelta(seconds=i)).isoformat(),
+                "price": 1.10000
+            }
+            for i in range(-2, 3)
+        ]
+        create_response = await async_client.post("/ticks/bulk", json=ticks)
+        assert create_response.status_code == 201
         
-        response = await async_client.get(
-            f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD&limit=10"
-        )
+        response = await async_client.get("/ticks/", params={
+            "start": (midnight - timedelta(seconds=2)).isoformat(),
+            "end": (midnight + timedelta(seconds=3)).isoformat(),
+            "symbol": "EURUSD"
+        })
         
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
-        assert len(data) <= 10
+        # Rows from both chunks, merged back into time order
+        returned = [datetime.fromisoformat(tick["time"].replace('Z', '+00:00')) for tick in data]
+        assert returned == [datetime.fromisoformat(tick["time"]) for tick in ticks]
 
-    async def test_get_ticks_invalid_time_range(self, async_client: AsyncClient):
+    async def test_get_ticks_invalid_time_range(self, async_client: AsyncClient, moving_clock):
         """Test GET /ticks/ with invalid time range (start > end)."""
-        start = datetime.now(timezone.utc)
+        start = moving_clock()
         end = start - timedelta(hours=1)
         
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
-        
-        response = await async_client.get(
-            f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD"
-        )
+        response = await async_client.get("/ticks/", params={
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "symbol": "EURUSD"
+        })
         
-        # Should return empty list or validation error
-        assert response.status_code in [200, 400, 422]
+        # Like DELETE, the API doesn't validate start < end: the range is just empty
+        assert response.status_code == 200
+        assert response.json() == []
 
-    async def test_update_tick_price(self, async_client: AsyncClient):
+    async def test_update_tick_price(self, async_client: AsyncClient, make_tick):
         """Test PUT /ticks/ - Update tick price."""
         # First create a tick
-        tick_time = datetime.now(timezone.utc)
-        create_data = {
-            "symbol": "EURUSD",
-            "time": tick_time.isoformat(),
-            "price": 1.12345
-        }
+        create_data, tick_time = make_tick()
         
         create_response = await async_client.post("/ticks/", json=create_data)
         assert create_response.status_code == 201
         
         # Update the tick - time and symbol are query params, not in body
-        time_encoded = tick_time.isoformat().replace('+', '%2B')
         update_data = {"price": 1.12999}
         
         update_response = await async_client.put(
-            f"/ticks/?time={time_encoded}&symbol=EURUSD",
+            "/ticks/",
+            params={"time": tick_time, "symbol": "EURUSD"},
             json=update_data
         )
         
-        # Should succeed or return 404 if tick not found (timing issue)
-        assert update_response.status_code in [200, 404]
-        
-        if update_response.status_code == 200:
-            data = update_response.json()
-            assert data["price"] == update_data["price"]
+        assert update_response.status_code == 200
+        data = update_response.json()
+        assert data["price"] == update_data["price"]
 
-    async def test_update_nonexistent_tick(self, async_client: AsyncClient):
-        """Test PUT /ticks/ for non-existent tick."""
-        old_time = datetime(2000, 1, 1, tzinfo=timezone.utc)
-        time_encoded = old_time.isoformat().replace('+', '%2B')
-        update_data = {"price": 1.12345}
-        
-        response = await async_client.put(
-            f"/ticks/?time={time_encoded}&symbol=EURUSD",
-            json=update_data
-        )
-        assert response.status_code == 404
-
-    async def test_delete_ticks_by_range(self, async_client: AsyncClient):
+    async def test_delete_ticks_by_range(self, async_client: AsyncClient, moving_clock):
         """Test DELETE /ticks/ - Delete ticks by time range."""
-        # Create test ticks first
-        base_time = datetime.now(timezone.utc)
-        for i in range(3):
-            tick_data = {
+        # Delete needs rows of its own: the shared seed window stays intact
+        base_time = moving_clock()
+        ticks = [
+            {
                 "symbol": "EURUSD",
                 "time": (base_time + timedelta(seconds=i)).isoformat(),
                 "price": 1.12345
             }
-            await async_client.post("/ticks/", json=tick_data)
+            for i in range(3)
+        ]
+        create_response = await async_client.post("/ticks/bulk", json=ticks)
+        assert create_response.status_code == 201
         
         # Delete ticks
-        start = base_time - timedelta(seconds=1)
-        end = base_time + timedelta(seconds=10)
-        
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
-        
-        response = await async_client.delete(
-            f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD"
-        )
+        response = await async_client.delete("/ticks/", params={
+            "start": (base_time - timedelta(seconds=1)).isoformat(),
+            "end": (base_time + timedelta(seconds=10)).isoformat(),
+            "symbol": "EURUSD"
+        })
         
         assert response.status_code == 200
         data = response.json()
         assert "deleted" in data
-        assert data["deleted"] >= 0  # May delete 0 if ticks not yet committed
+        assert data["deleted"] >= 3
         assert "message" in data
 
-    async def test_delete_ticks_invalid_range(self, async_client: AsyncClient):
+    async def test_delete_ticks_chunk_aligned(self, async_client: AsyncClient, timescaledb):
+        """Test DELETE /ticks/?chunk_aligned=true drops whole day chunks."""
+        # A day of its own, so the dropped chunk holds only this test's ticks
+        day = datetime(2000, 1, 5, tzinfo=timezone.utc)
+        ticks = [
+            {"symbol": "EURUSD", "time": (day + timedelta(hours=i)).isoformat(), "price": 1.10000}
+            for i in range(3)
+        ]
+        create_response = await async_client.post("/ticks/bulk", json=ticks)
+        assert create_response.status_code == 201
+        
+        window = {"start": day.isoformat(), "end": (day + timedelta(days=1)).isoformat()}
+        response = await async_client.delete("/ticks/", params={**window, "chunk_aligned": "true"})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"dropped_chunks", "message"}
+        assert data["dropped_chunks"] == 1
+        
+        response = await async_client.get("/ticks/", params={**window, "symbol": "EURUSD"})
+        assert response.json() == []
+
+    async def test_delete_ticks_invalid_range(self, async_client: AsyncClient, moving_clock):
         """Test DELETE /ticks/ with start > end."""
-        start = datetime.now(timezone.utc)
+        start = moving_clock()
         end = start - timedelta(hours=1)
         
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
-        
-        response = await async_client.delete(
-            f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD"
-        )
+        response = await async_client.delete("/ticks/", params={
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "symbol": "EURUSD"
+        })
         
         # API doesn't validate start < end, just returns 0 deleted
         assert response.status_code == 200
         data = response.json()
         assert data["deleted"] == 0
 
-    async def test_delete_single_tick(self, async_client: AsyncClient):
+    async def test_delete_single_tick(self, async_client: AsyncClient, make_tick):
         """Test DELETE /ticks/{symbol}/{time} - Delete single tick."""
         # Create a tick first
-        tick_time = datetime.now(timezone.utc)
-        tick_data = {
-            "symbol": "EURUSD",
-            "time": tick_time.isoformat(),
-            "price": 1.12345
-        }
+        tick_data, tick_time = make_tick()
         
         create_response = await async_client.post("/ticks/", json=tick_data)
         assert create_response.status_code == 201
         
         # Delete the tick
-        encoded_time = tick_time.isoformat().replace('+', '%2B')
-        response = await async_client.delete(f"/ticks/EURUSD/{encoded_time}")
-        
-        # Should succeed or return 404 (timing issue)
-        assert response.status_code in [200, 404]
-        
-        if response.status_code == 200:
-            data = response.json()
-            assert "deleted" in data["message"].lower()
-
-    async def test_delete_nonexistent_single_tick(self, async_client: AsyncClient):
-        """Test DELETE /ticks/{symbol}/{time} for non-existent tick."""
-        tick_time = datetime(2000, 1, 1, tzinfo=timezone.utc)
-        encoded_time = tick_time.isoformat().replace('+', '%2B')
+        response = await async_client.delete(f"/ticks/EURUSD/{quote(tick_time)}")
         
-        response = await async_client.delete(f"/ticks/EURUSD/{encoded_time}")
-        assert response.status_code == 404
+        assert response.status_code == 200
+        data = response.json()
+        assert "deleted" in data["message"].lower()
 
-    async def test_create_tick_duplicate(self, async_client: AsyncClient):
+    async def test_create_tick_duplicate(self, async_client: AsyncClient, make_tick):
         """Test creating duplicate tick (same symbol + time)."""
-        tick_data = {
-            "symbol": "EURUSD",
-            "time": datetime.now(timezone.utc).isoformat(),
-            "price": 1.12345
-        }
+        tick_data, _ = make_tick()
         
-        # First creation should succeed
-        response1 = await async_client.post("/ticks/", json=tick_data)
-        assert response1.status_code == 201
+        # Both copies in one request: backfill keeps the first and skips the conflict
+        response = await async_client.post("/ticks/bulk?mode=backfill", json=[tick_data, tick_data])
         
-        # Second creation with same time should fail or be handled by ON CONFLICT
-        response2 = await async_client.post("/ticks/", json=tick_data)
-        # API returns 400 for duplicate keys, not 409
-        assert response2.status_code in [201, 400, 409]
+        assert response.status_code == 201
+        assert response.json()["created"] == 1
 
-    async def test_tick_api_with_different_symbols(self, async_client: AsyncClient):
+    async def test_tick_api_with_different_symbols(self, async_client: AsyncClient, make_tick):
         """Test tick API with different currency symbols."""
         symbols = ["EURUSD", "GBPUSD", "USDJPY"]
         
-        for symbol in symbols:
-            tick_data = {
-                "symbol": symbol,
-                "time": datetime.now(timezone.utc).isoformat(),
-                "price": 1.12345
-            }
-            
-            response = await async_client.post("/ticks/", json=tick_data)
+        # Independent inserts, so the three requests can overlap
+        responses = await asyncio.gather(*[
+            async_client.post("/ticks/", json=make_tick(symbol)[0])
+            for symbol in symbols
+        ])
+        
+        for symbol, response in zip(symbols, responses):
             assert response.status_code == 201
             
             data = response.json()
             assert data["symbol"] == symbol
 
-    async def test_bulk_create_large_batch(self, async_client: AsyncClient):
+    @pytest.mark.slow
+    async def test_bulk_create_large_batch(self, async_client: AsyncClient, moving_clock):
         """Test bulk create with larger batch (100 ticks)."""
-        base_time = datetime.now(timezone.utc)
+        # One microsecond apart, formatted in a single vectorized call
+        times = np.datetime_as_string(
+            np.datetime64(moving_clock().replace(tzinfo=None), "us") + np.arange(100),
+            timezone="UTC"
+        ).tolist()
         bulk_data = [
-            {
-                "symbol": "EURUSD",
-                "time": (base_time + timedelta(seconds=i)).isoformat(),
-                "price": 1.12345 + (i * 0.00001)
-            }
-            for i in range(100)
+            {"symbol": "EURUSD", "time": tick_time, "price": 1.12345 + (i * 0.00001)}
+            for i, tick_time in enumerate(times)
         ]
         
-        response = await async_client.post("/ticks/bulk", json=bulk_data)
+        response = await async_client.post(
+            "/ticks/bulk",
+            content=orjson.dumps(bulk_data),
+            headers={"content-type": "application/json"}
+        )
         
         assert response.status_code == 201
         data = response.json()
         assert data["created"] == 100
 
-    async def test_get_ticks_pagination(self, async_client: AsyncClient):
+    @pytest.mark.slow
+    @pytest.mark.parametrize("limit", [1, 10, 100, 1000])
+    async def test_get_ticks_pagination(self, async_client: AsyncClient, seeded_ticks, limit):
         """Test pagination with different limit values."""
-        end = datetime.now(timezone.utc)
-        start = end - timedelta(hours=24)
-        
-        # URL encode timestamps (+ -> %2B)
-        start_encoded = start.isoformat().replace('+', '%2B')
-        end_encoded = end.isoformat().replace('+', '%2B')
-        
-        limits = [1, 10, 100, 1000]
+        response = await async_client.get("/ticks/", params={**seeded_ticks, "limit": limit})
         
-        for limit in limits:
-            response = await async_client.get(
-                f"/ticks/?start={start_encoded}&end={end_encoded}&symbol=EURUSD&limit={limit}"
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) <= limit
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == limit
 
-    async def test_tick_timestamp_precision(self, async_client: AsyncClient):
+    async def test_tick_timestamp_precision(self, async_client: AsyncClient, make_tick):
         """Test that tick timestamps preserve microsecond precision."""
-        tick_time = datetime.now(timezone.utc)
-        tick_data = {
-            "symbol": "EURUSD",
-            "time": tick_time.isoformat(),
-            "price": 1.12345
-        }
+        tick_data, tick_iso = make_tick()
+        tick_time = datetime.fromisoformat(tick_iso)
         
         response = await async_client.post("/ticks/", json=tick_data)
         assert response.status_code == 201
         
+        # Read it back from the database: the half-open range holds exactly that microsecond
+        response = await async_client.get("/ticks/", params={
+            "start": tick_iso,
+            "end": (tick_time + timedelta(microseconds=1)).isoformat(),
+            "symbol": tick_data["symbol"]
+        })
+        assert response.status_code == 200
         data = response.json()
-        # Verify time is returned and can be parsed
-        returned_time = datetime.fromisoformat(data["time"].replace('Z', '+00:00'))
-        assert returned_time.year == tick_time.year
-        assert returned_time.month == tick_time.month
-        assert returned_time.day == tick_time.day
+        assert len(data) == 1
+        
+        # Integer epoch microseconds: exact, unlike float timestamp() arithmetic
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        one_us = timedelta(microseconds=1)
+        returned_time = datetime.fromisoformat(data[0]["time"].replace('Z', '+00:00'))
+        assert (returned_time - epoch) // one_us == (tick_time - epoch) // one_us